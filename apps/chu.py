@@ -229,28 +229,11 @@ class chu(gr.top_block, Qt.QWidget):
         self.osmosdr_source_1.set_bb_gain(20, 0)
         self.osmosdr_source_1.set_antenna('', 0)
         self.osmosdr_source_1.set_bandwidth(0, 0)
-        self.low_pass_filter_1 = filter.fir_filter_ccf(
-            10,
-            firdes.low_pass(
-                1000,
-                samp_rate / 25,
-                200,
-                50,
-                window.WIN_HAMMING,
-                6.76))
-        self.low_pass_filter_0 = filter.fir_filter_ccf(
-            decimation,
-            firdes.low_pass(
-                1,
-                samp_rate,
-                20000,
-                5000,
-                window.WIN_HAMMING,
-                6.76))
-        self.ham_chu_decode_0 = ham.chu_decode()
+        self.ham_xlating_decimator_1 = ham.xlating_decimator(samp_rate / decimation, 10, (space_tone + mark_tone) / 2, 200, 50, 1000)
+        self.ham_xlating_decimator_0 = ham.xlating_decimator(samp_rate, decimation, offset, 20000, 5000, 1.0)
+        self.ham_chu_decode_0 = ham.chu_decode(32)
         self.digital_binary_slicer_fb_0 = digital.binary_slicer_fb()
-        self.blocks_multiply_xx_2 = blocks.multiply_vcc(1)
-        self.blocks_multiply_xx_0 = blocks.multiply_vcc(1)
+        self.blocks_message_debug_0 = blocks.message_debug()
         self.blocks_complex_to_real_0 = blocks.complex_to_real(1)
         self.blocks_char_to_float_0 = blocks.char_to_float(1, 0.5)
         self.blocks_add_const_vxx_0 = blocks.add_const_ff(-1)
@@ -265,8 +248,6 @@ class chu(gr.top_block, Qt.QWidget):
                 window.WIN_HAMMING,
                 6.76))
         self.audio_sink_0_0 = audio.sink(48000, '', True)
-        self.analog_sig_source_x_1 = analog.sig_source_c(samp_rate / decimation, analog.GR_COS_WAVE, -(space_tone + mark_tone) / 2, 1, 0, 0)
-        self.analog_sig_source_x_0 = analog.sig_source_c(samp_rate, analog.GR_COS_WAVE, -offset, 1, 0, 0)
         self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf(channel_rate / (3.1416*(mark_tone - space_tone)))
         self.analog_pll_carriertracking_cc_0 = analog.pll_carriertracking_cc(3.1416 / 500, 1.8, -1.8)
         self.analog_agc_xx_0 = analog.agc_ff(1e-1, 0.02, 1.0)
@@ -277,25 +258,22 @@ class chu(gr.top_block, Qt.QWidget):
         ##################################################
         # Connections
         ##################################################
+        self.msg_connect((self.ham_chu_decode_0, 'frames'), (self.blocks_message_debug_0, 'print'))
         self.connect((self.analog_agc_xx_0, 0), (self.audio_sink_0_0, 0))
         self.connect((self.analog_pll_carriertracking_cc_0, 0), (self.band_pass_filter_0, 0))
-        self.connect((self.analog_pll_carriertracking_cc_0, 0), (self.blocks_multiply_xx_2, 0))
+        self.connect((self.analog_pll_carriertracking_cc_0, 0), (self.ham_xlating_decimator_1, 0))
         self.connect((self.analog_pll_carriertracking_cc_0, 0), (self.qtgui_waterfall_sink_x_0, 0))
         self.connect((self.analog_quadrature_demod_cf_0, 0), (self.root_raised_cosine_filter_0, 0))
-        self.connect((self.analog_sig_source_x_0, 0), (self.blocks_multiply_xx_0, 1))
-        self.connect((self.analog_sig_source_x_1, 0), (self.blocks_multiply_xx_2, 1))
         self.connect((self.band_pass_filter_0, 0), (self.blocks_complex_to_real_0, 0))
         self.connect((self.blocks_add_const_vxx_0, 0), (self.qtgui_time_sink_x_0, 1))
         self.connect((self.blocks_char_to_float_0, 0), (self.blocks_add_const_vxx_0, 0))
         self.connect((self.blocks_complex_to_real_0, 0), (self.analog_agc_xx_0, 0))
-        self.connect((self.blocks_multiply_xx_0, 0), (self.low_pass_filter_0, 0))
-        self.connect((self.blocks_multiply_xx_2, 0), (self.low_pass_filter_1, 0))
         self.connect((self.digital_binary_slicer_fb_0, 0), (self.blocks_char_to_float_0, 0))
         self.connect((self.digital_binary_slicer_fb_0, 0), (self.ham_chu_decode_0, 0))
-        self.connect((self.low_pass_filter_0, 0), (self.analog_pll_carriertracking_cc_0, 0))
-        self.connect((self.low_pass_filter_1, 0), (self.analog_quadrature_demod_cf_0, 0))
-        self.connect((self.low_pass_filter_1, 0), (self.qtgui_waterfall_sink_x_1, 0))
-        self.connect((self.osmosdr_source_1, 0), (self.blocks_multiply_xx_0, 0))
+        self.connect((self.ham_xlating_decimator_0, 0), (self.analog_pll_carriertracking_cc_0, 0))
+        self.connect((self.ham_xlating_decimator_1, 0), (self.analog_quadrature_demod_cf_0, 0))
+        self.connect((self.ham_xlating_decimator_1, 0), (self.qtgui_waterfall_sink_x_1, 0))
+        self.connect((self.osmosdr_source_1, 0), (self.ham_xlating_decimator_0, 0))
         self.connect((self.root_raised_cosine_filter_0, 0), (self.digital_binary_slicer_fb_0, 0))
         self.connect((self.root_raised_cosine_filter_0, 0), (self.qtgui_time_sink_x_0, 0))
 
@@ -311,11 +289,7 @@ class chu(gr.top_block, Qt.QWidget):
     def set_samp_rate(self, samp_rate):
         self.samp_rate = samp_rate
         self.set_decimation(self.samp_rate // 48000)
-        self.analog_sig_source_x_0.set_sampling_freq(self.samp_rate)
-        self.analog_sig_source_x_1.set_sampling_freq(self.samp_rate / self.decimation)
         self.band_pass_filter_0.set_taps(firdes.complex_band_pass(1, self.samp_rate / self.decimation, 200, 2800, 200, window.WIN_HAMMING, 6.76))
-        self.low_pass_filter_0.set_taps(firdes.low_pass(1, self.samp_rate, 20000, 5000, window.WIN_HAMMING, 6.76))
-        self.low_pass_filter_1.set_taps(firdes.low_pass(1000, self.samp_rate / 25, 200, 50, window.WIN_HAMMING, 6.76))
         self.osmosdr_source_1.set_sample_rate(self.samp_rate)
         self.qtgui_time_sink_x_0.set_samp_rate(self.samp_rate)
         self.qtgui_waterfall_sink_x_0.set_frequency_range(0, self.samp_rate)
@@ -334,14 +308,14 @@ class chu(gr.top_block, Qt.QWidget):
     def set_space_tone(self, space_tone):
         self.space_tone = space_tone
         self.analog_quadrature_demod_cf_0.set_gain(self.channel_rate / (3.1416*(self.mark_tone - self.space_tone)))
-        self.analog_sig_source_x_1.set_frequency(-(self.space_tone + self.mark_tone) / 2)
+        self.ham_xlating_decimator_1.set_center_freq((self.space_tone + self.mark_tone) / 2)
 
     def get_offset(self):
         return self.offset
 
     def set_offset(self, offset):
         self.offset = offset
-        self.analog_sig_source_x_0.set_frequency(-self.offset)
+        self.ham_xlating_decimator_0.set_center_freq(self.offset)
         self.osmosdr_source_1.set_center_freq(self.chu_freq - self.offset + self.upconverter_lo_freq, 0)
 
     def get_mark_tone(self):
@@ -350,7 +324,7 @@ class chu(gr.top_block, Qt.QWidget):
     def set_mark_tone(self, mark_tone):
         self.mark_tone = mark_tone
         self.analog_quadrature_demod_cf_0.set_gain(self.channel_rate / (3.1416*(self.mark_tone - self.space_tone)))
-        self.analog_sig_source_x_1.set_frequency(-(self.space_tone + self.mark_tone) / 2)
+        self.ham_xlating_decimator_1.set_center_freq((self.space_tone + self.mark_tone) / 2)
 
     def get_gain(self):
         return self.gain
@@ -364,7 +338,6 @@ class chu(gr.top_block, Qt.QWidget):
 
     def set_decimation(self, decimation):
         self.decimation = decimation
-        self.analog_sig_source_x_1.set_sampling_freq(self.samp_rate / self.decimation)
         self.band_pass_filter_0.set_taps(firdes.complex_band_pass(1, self.samp_rate / self.decimation, 200, 2800, 200, window.WIN_HAMMING, 6.76))
 
     def get_chu_freq(self):
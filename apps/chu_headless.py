@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# CHU receiver without a GUI: the DSP chain of chu.py, reading from an
+# SDR, a complex IQ file or a WAV file, and writing each decoded frame as
+# a line of JSON.
+
+from gnuradio import analog
+from gnuradio import blocks
+from gnuradio import digital
+from gnuradio import filter
+from gnuradio import gr
+from gnuradio.fft import window
+from gnuradio.filter import firdes
+import json
+import signal
+import sys
+from argparse import ArgumentParser
+from gnuradio.eng_arg import eng_float, intx
+import ham
+import pmt
+from iq_source import iq_source
+
+
+class frame_sink(gr.basic_block):
+    """
+    Write each message received on the "frames" port, such as a CHU frame,
+    as a line of JSON.
+    """
+    def __init__(self, output):
+        gr.basic_block.__init__(self,
+            name="frame_sink",
+            in_sig=None,
+            out_sig=None)
+        self.f = sys.stdout if output == "-" else open(output, "a")
+        self.message_port_register_in(pmt.intern("frames"))
+        self.set_msg_handler(pmt.intern("frames"), self.handle_frame)
+
+    def handle_frame(self, msg):
+        self.f.write(json.dumps(pmt.to_python(msg), sort_keys=True,
+                                default=lambda x: x.tolist()) + "\n")
+        self.f.flush()
+
+
+class chu_headless(gr.top_block):
+
+    def __init__(self, source="osmosdr", path="", args="", samp_rate=1200000, chu_freq=3330000,
+                 offset=100000, upconverter_lo_freq=0, gain=10, output="-", audio_out=False):
+        gr.top_block.__init__(self, "Chu Headless")
+
+        ##################################################
+        # Variables
+        ##################################################
+        self.space_tone = space_tone = 2025
+        self.mark_tone = mark_tone = 2225
+        self.int_rate = int_rate = 48000
+        self.channel_rate = channel_rate = 4800
+
+        ##################################################
+        # Blocks
+        ##################################################
+        src, samp_rate = iq_source(self, source, path, samp_rate,
+                                   chu_freq - offset + upconverter_lo_freq, gain, args)
+        if samp_rate % int_rate:
+            raise ValueError("sample rate must be a multiple of {0}".format(int_rate))
+        self.samp_rate = samp_rate
+        self.offset = offset
+        self.decimation = decimation = samp_rate // int_rate
+
+        self.root_raised_cosine_filter_0 = filter.fir_filter_fff(
+            1,
+            firdes.root_raised_cosine(
+                1,
+                channel_rate,
+                300,
+                0.35,
+                100))
+        self.ham_xlating_decimator_1 = ham.xlating_decimator(int_rate, int_rate // channel_rate, (space_tone + mark_tone) / 2, 200, 50, 1000)
+        self.ham_xlating_decimator_0 = ham.xlating_decimator(samp_rate, decimation, offset, 20000, 5000, 1.0)
+        self.ham_chu_decode_0 = ham.chu_decode(32)
+        self.frame_sink_0 = frame_sink(output)
+        self.digital_binary_slicer_fb_0 = digital.binary_slicer_fb()
+        self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf(channel_rate / (3.1416*(mark_tone - space_tone)))
+        self.analog_pll_carriertracking_cc_0 = analog.pll_carriertracking_cc(3.1416 / 500, 1.8, -1.8)
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.msg_connect((self.ham_chu_decode_0, 'frames'), (self.frame_sink_0, 'frames'))
+        self.connect((self.analog_pll_carriertracking_cc_0, 0), (self.ham_xlating_decimator_1, 0))
+        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.root_raised_cosine_filter_0, 0))
+        self.connect((self.digital_binary_slicer_fb_0, 0), (self.ham_chu_decode_0, 0))
+        self.connect((self.ham_xlating_decimator_0, 0), (self.analog_pll_carriertracking_cc_0, 0))
+        self.connect((self.ham_xlating_decimator_1, 0), (self.analog_quadrature_demod_cf_0, 0))
+        self.connect((self.root_raised_cosine_filter_0, 0), (self.digital_binary_slicer_fb_0, 0))
+        self.connect((src, 0), (self.ham_xlating_decimator_0, 0))
+
+        # The audio monitor is only built when asked for.
+        if audio_out:
+            from gnuradio import audio
+            self.band_pass_filter_0 = filter.fir_filter_ccc(
+                1,
+                firdes.complex_band_pass(
+                    1,
+                    int_rate,
+                    200,
+                    2800,
+                    200,
+                    window.WIN_HAMMING,
+                    6.76))
+            self.blocks_complex_to_real_0 = blocks.complex_to_real(1)
+            self.analog_agc_xx_0 = analog.agc_ff(1e-1, 0.02, 1.0)
+            self.analog_agc_xx_0.set_max_gain(65536)
+            self.audio_sink_0 = audio.sink(int_rate, '', True)
+            self.connect((self.analog_pll_carriertracking_cc_0, 0), (self.band_pass_filter_0, 0))
+            self.connect((self.band_pass_filter_0, 0), (self.blocks_complex_to_real_0, 0))
+            self.connect((self.blocks_complex_to_real_0, 0), (self.analog_agc_xx_0, 0))
+            self.connect((self.analog_agc_xx_0, 0), (self.audio_sink_0, 0))
+
+
+def argument_parser():
+    parser = ArgumentParser(description="Decode the CHU time signal without a GUI.")
+    parser.add_argument(
+        "--source", choices=["osmosdr", "file", "sigmf", "wav"], default="osmosdr",
+        help="Set input: SDR, complex float IQ file, SigMF recording or WAV file [default=%(default)r]")
+    parser.add_argument(
+        "--path", default="",
+        help="Set input file for file, sigmf and wav sources [default=%(default)r]")
+    parser.add_argument(
+        "--args", default="",
+        help="Set osmosdr device arguments [default=%(default)r]")
+    parser.add_argument(
+        "--samp-rate", dest="samp_rate", type=intx, default=1200000,
+        help="Set sample rate of SDR and IQ file input, a multiple of 48 kHz [default=%(default)r]")
+    parser.add_argument(
+        "--chu-freq", dest="chu_freq", type=eng_float, default=3330000,
+        help="Set CHU frequency [default=%(default)r]")
+    parser.add_argument(
+        "--offset", type=eng_float, default=100000,
+        help="Set CHU carrier offset from the centre of the input [default=%(default)r]")
+    parser.add_argument(
+        "--upconverter-lo-freq", dest="upconverter_lo_freq", type=eng_float, default=0,
+        help="Set upconverter LO frequency [default=%(default)r]")
+    parser.add_argument(
+        "--gain", type=eng_float, default=10,
+        help="Set RX gain [default=%(default)r]")
+    parser.add_argument(
+        "--output", default="-",
+        help="Set file to append decoded frames to, - for stdout [default=%(default)r]")
+    parser.add_argument(
+        "--audio", dest="audio_out", action="store_true",
+        help="Play the received audio")
+    return parser
+
+
+def main(top_block_cls=chu_headless, options=None):
+    if options is None:
+        options = argument_parser().parse_args()
+    tb = top_block_cls(source=options.source, path=options.path, args=options.args,
+                       samp_rate=options.samp_rate, chu_freq=options.chu_freq,
+                       offset=options.offset, upconverter_lo_freq=options.upconverter_lo_freq,
+                       gain=options.gain, output=options.output, audio_out=options.audio_out)
+
+    def sig_handler(sig=None, frame=None):
+        tb.stop()
+        tb.wait()
+
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, sig_handler)
+    signal.signal(signal.SIGTERM, sig_handler)
+
+    tb.start()
+    tb.wait()
+
+
+if __name__ == '__main__':
+    main()
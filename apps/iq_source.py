@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# Input selection shared by the headless receivers.
+
+from gnuradio import blocks
+from gnuradio import gr
+import json
+import numpy
+
+
+# Interleaved I/Q sample formats of SigMF recordings: numpy type, zero
+# level and scale to +/-1.
+sigmf_datatypes = {
+    "cf32_le": (numpy.float32, 0.0, 1.0),
+    "ci16_le": (numpy.int16, 0.0, 1.0 / 32768),
+    "ci8": (numpy.int8, 0.0, 1.0 / 128),
+    "cu8": (numpy.uint8, 127.5, 1.0 / 128),
+}
+
+
+class memmap_source(gr.sync_block):
+    """
+    Complex source reading an IQ recording through a memory map, so that
+    it is paged in by the kernel instead of copied through read() calls.
+    The samples are interleaved I and Q in one of sigmf_datatypes.
+    """
+    def __init__(self, path, datatype="cf32_le"):
+        gr.sync_block.__init__(self,
+            name="memmap_source",
+            in_sig=None,
+            out_sig=[numpy.complex64])
+        dtype, self.zero, self.scale = sigmf_datatypes[datatype]
+        self.samples = numpy.memmap(path, dtype=dtype, mode="r").reshape(-1, 2)
+        self.index = 0
+
+    def __len__(self):
+        return len(self.samples)
+
+    def work(self, input_items, output_items):
+        out0 = output_items[0]
+        n = min(len(out0), len(self.samples) - self.index)
+        if n == 0:
+            return -1 # WORK_DONE
+
+        chunk = self.samples[self.index:self.index + n]
+        if self.scale == 1.0 and self.zero == 0.0:
+            out0[:n] = chunk.view(numpy.complex64)[:, 0]
+        else:
+            out0[:n].real = (chunk[:, 0] - self.zero) * self.scale
+            out0[:n].imag = (chunk[:, 1] - self.zero) * self.scale
+        self.index += n
+        return n
+
+
+def read_sigmf(path):
+    """
+    Return the data file, data type, sample rate and centre frequency (or
+    None) of a SigMF recording, given the name of either of its files.
+    """
+    base = path
+    for extension in (".sigmf-meta", ".sigmf-data"):
+        if base.endswith(extension):
+            base = base[:-len(extension)]
+    with open(base + ".sigmf-meta") as f:
+        meta = json.load(f)
+    captures = meta.get("captures") or [{}]
+    return (base + ".sigmf-data", meta["global"]["core:datatype"],
+            meta["global"]["core:sample_rate"], captures[0].get("core:frequency"))
+
+
+def iq_source(tb, source, path, samp_rate, freq, gain, args=""):
+    """
+    Create the complex source of a headless flowgraph, and return the
+    block to connect from and its sample rate.  IQ files are complex
+    floats, while SigMF recordings give their own format and sample rate.
+    A WAV file with two channels is taken as I and Q; with one, as a real
+    signal.
+    """
+    if source == "osmosdr":
+        import osmosdr
+        tb.osmosdr_source_0 = osmosdr.source(args="numchan=1 " + args)
+        tb.osmosdr_source_0.set_sample_rate(samp_rate)
+        tb.osmosdr_source_0.set_center_freq(freq, 0)
+        tb.osmosdr_source_0.set_freq_corr(0, 0)
+        tb.osmosdr_source_0.set_gain(gain, 0)
+        tb.osmosdr_source_0.set_if_gain(20, 0)
+        tb.osmosdr_source_0.set_bb_gain(20, 0)
+        tb.osmosdr_source_0.set_antenna('', 0)
+        tb.osmosdr_source_0.set_bandwidth(0, 0)
+        return tb.osmosdr_source_0, samp_rate
+    elif source == "file":
+        tb.memmap_source_0 = memmap_source(path)
+        return tb.memmap_source_0, samp_rate
+    elif source == "sigmf":
+        data_path, datatype, samp_rate, freq = read_sigmf(path)
+        tb.memmap_source_0 = memmap_source(data_path, datatype)
+        return tb.memmap_source_0, int(samp_rate)
+    elif source == "wav":
+        tb.blocks_wavfile_source_0 = blocks.wavfile_source(path, False)
+        tb.blocks_float_to_complex_0 = blocks.float_to_complex(1)
+        for channel in range(min(tb.blocks_wavfile_source_0.channels(), 2)):
+            tb.connect((tb.blocks_wavfile_source_0, channel), (tb.blocks_float_to_complex_0, channel))
+        for channel in range(2, tb.blocks_wavfile_source_0.channels()):
+            tb.connect((tb.blocks_wavfile_source_0, channel), blocks.null_sink(gr.sizeof_float))
+        return tb.blocks_float_to_complex_0, tb.blocks_wavfile_source_0.sample_rate()
+    raise ValueError("unknown source: " + source)
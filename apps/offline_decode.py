@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# Decode an IQ recording as fast as the CPU allows.  Each selected decoder
+# runs its own flowgraph over a memory map of the recording, with no
+# throttle or audio sink to pace it.
+
+from gnuradio import analog
+from gnuradio import blocks
+from gnuradio import digital
+from gnuradio import filter
+from gnuradio import gr
+from gnuradio.fft import window
+from gnuradio.filter import firdes
+import math
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from gnuradio.eng_arg import eng_float, intx
+import ham
+from chu_headless import chu_headless, frame_sink
+from iq_source import iq_source, memmap_source, read_sigmf
+from psk31_rx_headless import psk31_rx_headless
+
+
+class dstar_rx_headless(gr.top_block):
+
+    def __init__(self, source="file", path="", samp_rate=960000, offset=0, output_dir=".", invert=False):
+        gr.top_block.__init__(self, "D-STAR Rx Headless")
+
+        ##################################################
+        # Variables
+        ##################################################
+        self.int_rate = int_rate = 48000
+        self.channel_rate = channel_rate = 4800
+        # GMSK with a modulation index of 0.5
+        self.deviation = deviation = channel_rate / 4
+
+        ##################################################
+        # Blocks
+        ##################################################
+        src, samp_rate = iq_source(self, source, path, samp_rate, 0, 0)
+        if samp_rate % int_rate:
+            raise ValueError("sample rate must be a multiple of {0}".format(int_rate))
+        self.samp_rate = samp_rate
+
+        self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(samp_rate // int_rate, firdes.low_pass(1, samp_rate, 6000, 6000, window.WIN_HAMMING, 6.76), offset, samp_rate)
+        self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf((-1 if invert else 1) * int_rate / (2 * math.pi * deviation))
+        self.digital_clock_recovery_mm_xx_0 = digital.clock_recovery_mm_ff(int_rate / channel_rate, 0.25*0.175*0.175, 0.5, 0.175, 0.005)
+        self.digital_binary_slicer_fb_0 = digital.binary_slicer_fb()
+        self.ham_dstar_rx_0 = ham.dstar_rx(os.path.join(output_dir, "dstar.dst"), 50, verbose=False)
+        self.blocks_null_sink_0 = blocks.null_sink(gr.sizeof_char*1)
+        self.frame_sink_0 = frame_sink(os.path.join(output_dir, "dstar.jsonl"))
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.msg_connect((self.ham_dstar_rx_0, 'slow_data'), (self.frame_sink_0, 'frames'))
+        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.digital_clock_recovery_mm_xx_0, 0))
+        self.connect((self.digital_binary_slicer_fb_0, 0), (self.ham_dstar_rx_0, 0))
+        self.connect((self.digital_clock_recovery_mm_xx_0, 0), (self.digital_binary_slicer_fb_0, 0))
+        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.analog_quadrature_demod_cf_0, 0))
+        self.connect((self.ham_dstar_rx_0, 0), (self.blocks_null_sink_0, 0))
+        self.connect((src, 0), (self.freq_xlating_fir_filter_xxx_0, 0))
+
+
+def argument_parser():
+    parser = ArgumentParser(description="Decode an IQ recording faster than real time. "
+        "Signal frequencies are absolute if the centre frequency of the recording is "
+        "known, and offsets from its centre otherwise.")
+    parser.add_argument(
+        "path",
+        help="Set recording: complex float IQ file, or either file of a SigMF recording")
+    parser.add_argument(
+        "--samp-rate", dest="samp_rate", type=intx, default=None,
+        help="Set sample rate of an IQ file, a multiple of 48 kHz")
+    parser.add_argument(
+        "--center-freq", dest="center_freq", type=eng_float, default=None,
+        help="Set centre frequency of the recording [default: from SigMF metadata, or 0]")
+    parser.add_argument(
+        "--chu", type=eng_float, action="append", default=[],
+        help="Decode CHU with its carrier at this frequency")
+    parser.add_argument(
+        "--psk31", type=eng_float, action="append", default=[],
+        help="Decode PSK31 at this frequency")
+    parser.add_argument(
+        "--dstar", type=eng_float, action="append", default=[],
+        help="Decode D-STAR at this frequency")
+    parser.add_argument(
+        "--dstar-invert", dest="dstar_invert", action="store_true",
+        help="Invert the D-STAR demodulator output")
+    parser.add_argument(
+        "--output-dir", dest="output_dir", default=".",
+        help="Set directory for the decoded output [default=%(default)r]")
+    return parser
+
+
+def main(options=None):
+    if options is None:
+        options = argument_parser().parse_args()
+
+    if ".sigmf-" in options.path:
+        source = "sigmf"
+        data_path, datatype, samp_rate, center_freq = read_sigmf(options.path)
+    else:
+        source = "file"
+        data_path, datatype, samp_rate, center_freq = options.path, "cf32_le", options.samp_rate, None
+        if samp_rate is None:
+            sys.exit("--samp-rate is needed for IQ files")
+    if options.center_freq is not None:
+        center_freq = options.center_freq
+    center_freq = center_freq or 0
+    duration = len(memmap_source(data_path, datatype)) / samp_rate
+
+    # Each decoder writes to its own file: CHU frames and D-STAR slow data
+    # as JSON lines, PSK31 text, and D-STAR AMBE frames in a .dst file.
+    def output(name, n):
+        return os.path.join(options.output_dir, name if n == 0 else "{0}-{1}".format(n, name))
+
+    tbs = []
+    for n, freq in enumerate(options.chu):
+        tbs.append(chu_headless(source=source, path=options.path, samp_rate=samp_rate,
+                                offset=freq - center_freq, output=output("chu.jsonl", n)))
+    for n, freq in enumerate(options.psk31):
+        tb = psk31_rx_headless(source=source, path=options.path, samp_rate=samp_rate,
+                               offset=freq - center_freq - 1000, psk_offset=1000,
+                               output=output("psk31.txt", n))
+        tbs.append(tb)
+    for n, freq in enumerate(options.dstar):
+        directory = output("dstar", n)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tbs.append(dstar_rx_headless(source=source, path=options.path, samp_rate=samp_rate,
+                                     offset=freq - center_freq, output_dir=directory,
+                                     invert=options.dstar_invert))
+    if not tbs:
+        sys.exit("Nothing to decode: give at least one of --chu, --psk31 and --dstar")
+
+    start = time.time()
+    for tb in tbs:
+        tb.start()
+    for tb in tbs:
+        tb.wait()
+    elapsed = time.time() - start
+    sys.stderr.write("Decoded {0:.1f} s of recording in {1:.1f} s ({2:.1f}x real time)\n".format(
+        duration, elapsed, duration / elapsed))
+
+
+if __name__ == '__main__':
+    main()
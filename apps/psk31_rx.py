@@ -360,12 +360,14 @@ class psk31_rx(gr.top_block, Qt.QWidget):
         self.osmosdr_source_0.set_antenna('', 0)
         self.osmosdr_source_0.set_bandwidth(0, 0)
         self.ham_varicode_rx_0 = ham.varicode_rx()
+        self.ham_psk31_detect_0 = ham.psk31_detect(audio_rate, psk_offset, 2048, 0.5, 8, 10.0, 200, 2800)
         self.freq_xlating_fir_filter_xxx_1 = filter.freq_xlating_fir_filter_ccc(16, firdes.low_pass(10, audio_rate, 120, 40, window.WIN_HAMMING, 6.76), psk_offset, audio_rate)
         self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(samp_rate // int_rate, firdes.low_pass(1, samp_rate, 12000, 12000, window.WIN_HAMMING, 6.76), round(psk_center - center_freq,-3), samp_rate)
         self.digital_diff_phasor_cc_0 = digital.diff_phasor_cc()
         self.digital_costas_loop_cc_0 = digital.costas_loop_cc(5 * math.pi /100.0, 2, False)
         self.digital_clock_recovery_mm_xx_0 = digital.clock_recovery_mm_cc(16, 0.25*0.175*0.175, 0.5, 0.175, 0.005)
         self.digital_binary_slicer_fb_0 = digital.binary_slicer_fb()
+        self.blocks_msg_pair_to_var_0 = blocks.msg_pair_to_var(self.set_psk_offset)
         self.blocks_file_sink_0 = blocks.file_sink(gr.sizeof_char*1, 'psk31.txt', False)
         self.blocks_file_sink_0.set_unbuffered(True)
         self.blocks_complex_to_real_1 = blocks.complex_to_real(1)
@@ -388,8 +390,10 @@ class psk31_rx(gr.top_block, Qt.QWidget):
         ##################################################
         # Connections
         ##################################################
+        self.msg_connect((self.ham_psk31_detect_0, 'freq'), (self.blocks_msg_pair_to_var_0, 'inpair'))
         self.connect((self.analog_agc_xx_0, 0), (self.blocks_complex_to_real_0, 0))
         self.connect((self.analog_agc_xx_0, 0), (self.freq_xlating_fir_filter_xxx_1, 0))
+        self.connect((self.analog_agc_xx_0, 0), (self.ham_psk31_detect_0, 0))
         self.connect((self.band_pass_filter_0, 0), (self.analog_agc_xx_0, 0))
         self.connect((self.blocks_complex_to_real_0, 0), (self.audio_sink_0, 0))
         self.connect((self.blocks_complex_to_real_0, 0), (self.qtgui_waterfall_sink_x_2, 0))
@@ -446,6 +450,7 @@ class psk31_rx(gr.top_block, Qt.QWidget):
     def set_psk_offset(self, psk_offset):
         self.psk_offset = psk_offset
         self.freq_xlating_fir_filter_xxx_1.set_center_freq(self.psk_offset)
+        self.ham_psk31_detect_0.set_freq(self.psk_offset)
 
     def get_psk_center(self):
         return self.psk_center
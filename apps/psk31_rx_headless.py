@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# PSK31 receiver without a GUI: the DSP chain of psk31_rx.py, reading from
+# an SDR, a complex IQ file or a WAV file, and writing the decoded text to
+# a file or stdout.  The decoder can follow the signal nearest to its
+# offset automatically, or, in skimmer mode, every signal in the audio
+# channel is decoded, up to a given number at a time.
+
+from gnuradio import analog
+from gnuradio import blocks
+from gnuradio import digital
+from gnuradio import filter
+from gnuradio import gr
+from gnuradio.fft import window
+from gnuradio.filter import firdes
+import math
+import numpy
+import re
+import signal
+import sys
+from argparse import ArgumentParser
+from gnuradio.eng_arg import eng_float, intx
+import ham
+from iq_source import iq_source
+import pmt
+
+
+class text_sink(gr.sync_block):
+    """
+    Write the text decoded by one slot of a PSK31 skimmer in lines,
+    prefixed with the frequency announced for the slot on the "channels"
+    port.
+    """
+    def __init__(self, slot, f):
+        gr.sync_block.__init__(self,
+            name="text_sink",
+            in_sig=[numpy.int8],
+            out_sig=None)
+        self.slot = slot
+        self.f = f
+        self.freq = None
+        self.line = b""
+        self.message_port_register_in(pmt.intern("channels"))
+        self.set_msg_handler(pmt.intern("channels"), self.handle_channel)
+
+    def write_line(self):
+        line = self.line.strip()
+        if line and self.freq is not None:
+            self.f.write("{0:7.1f} Hz: {1}\n".format(self.freq, line.decode("latin-1")))
+            self.f.flush()
+        self.line = b""
+
+    def handle_channel(self, msg):
+        channel = pmt.to_python(msg)
+        if channel["slot"] == self.slot:
+            self.write_line()
+            self.freq = channel["freq"]
+
+    def work(self, input_items, output_items):
+        for text in re.split(b"([\r\n])", input_items[0].tobytes()):
+            if text in (b"\r", b"\n"):
+                self.write_line()
+            else:
+                self.line += text
+                if len(self.line) >= 80:
+                    self.write_line()
+        return len(input_items[0])
+
+
+class psk31_rx_headless(gr.top_block):
+
+    def __init__(self, source="osmosdr", path="", args="", samp_rate=960000, center_freq=441800000,
+                 offset=141000, psk_offset=1000, gain=10, output="-", audio_out=False, skim=0, afc=False):
+        gr.top_block.__init__(self, "Psk31 Rx Headless")
+
+        ##################################################
+        # Variables
+        ##################################################
+        self.int_rate = int_rate = 48000
+        self.audio_rate = audio_rate = 8000
+        self.psk_offset = psk_offset
+
+        ##################################################
+        # Blocks
+        ##################################################
+        src, samp_rate = iq_source(self, source, path, samp_rate, center_freq, gain, args)
+        if samp_rate % int_rate:
+            raise ValueError("sample rate must be a multiple of {0}".format(int_rate))
+        self.samp_rate = samp_rate
+        self.offset = offset
+
+        self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(samp_rate // int_rate, firdes.low_pass(1, samp_rate, 12000, 12000, window.WIN_HAMMING, 6.76), offset, samp_rate)
+        self.band_pass_filter_0 = filter.fir_filter_ccc(
+            int_rate // audio_rate,
+            firdes.complex_band_pass(
+                1,
+                int_rate,
+                200,
+                2800,
+                200,
+                window.WIN_HAMMING,
+                6.76))
+        self.analog_agc_xx_0 = analog.agc_cc(1e-3, 0.1, 1.0)
+        self.analog_agc_xx_0.set_max_gain(65536)
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.connect((self.band_pass_filter_0, 0), (self.analog_agc_xx_0, 0))
+        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.band_pass_filter_0, 0))
+        self.connect((src, 0), (self.freq_xlating_fir_filter_xxx_0, 0))
+
+        if skim:
+            self.ham_psk31_skimmer_0 = ham.psk31_skimmer(audio_rate, skim, 200, 2800)
+            self.connect((self.analog_agc_xx_0, 0), (self.ham_psk31_skimmer_0, 0))
+            f = sys.stdout if output == "-" else open(output, "a")
+            self.text_sinks = []
+            for slot in range(skim):
+                sink = text_sink(slot, f)
+                self.msg_connect((self.ham_psk31_skimmer_0, 'channels'), (sink, 'channels'))
+                self.connect((self.ham_psk31_skimmer_0, slot), (sink, 0))
+                self.text_sinks.append(sink)
+        else:
+            self.ham_varicode_rx_0 = ham.varicode_rx()
+            self.freq_xlating_fir_filter_xxx_1 = filter.freq_xlating_fir_filter_ccc(16, firdes.low_pass(10, audio_rate, 120, 40, window.WIN_HAMMING, 6.76), psk_offset, audio_rate)
+            self.digital_diff_phasor_cc_0 = digital.diff_phasor_cc()
+            self.digital_costas_loop_cc_0 = digital.costas_loop_cc(5 * math.pi /100.0, 2, False)
+            self.digital_clock_recovery_mm_xx_0 = digital.clock_recovery_mm_cc(16, 0.25*0.175*0.175, 0.5, 0.175, 0.005)
+            self.digital_binary_slicer_fb_0 = digital.binary_slicer_fb()
+            self.blocks_file_sink_0 = blocks.file_sink(gr.sizeof_char*1, '/dev/stdout' if output == '-' else output, True)
+            self.blocks_file_sink_0.set_unbuffered(True)
+            self.blocks_complex_to_real_1 = blocks.complex_to_real(1)
+            self.connect((self.analog_agc_xx_0, 0), (self.freq_xlating_fir_filter_xxx_1, 0))
+            self.connect((self.blocks_complex_to_real_1, 0), (self.digital_binary_slicer_fb_0, 0))
+            self.connect((self.digital_binary_slicer_fb_0, 0), (self.ham_varicode_rx_0, 0))
+            self.connect((self.digital_clock_recovery_mm_xx_0, 0), (self.digital_diff_phasor_cc_0, 0))
+            self.connect((self.digital_costas_loop_cc_0, 0), (self.digital_clock_recovery_mm_xx_0, 0))
+            self.connect((self.digital_diff_phasor_cc_0, 0), (self.blocks_complex_to_real_1, 0))
+            self.connect((self.freq_xlating_fir_filter_xxx_1, 0), (self.digital_costas_loop_cc_0, 0))
+            self.connect((self.ham_varicode_rx_0, 0), (self.blocks_file_sink_0, 0))
+
+            if afc:
+                self.ham_psk31_detect_0 = ham.psk31_detect(audio_rate, psk_offset, 2048, 0.5, 8, 10.0, 200, 2800)
+                self.blocks_msg_pair_to_var_0 = blocks.msg_pair_to_var(self.set_psk_offset)
+                self.msg_connect((self.ham_psk31_detect_0, 'freq'), (self.blocks_msg_pair_to_var_0, 'inpair'))
+                self.connect((self.analog_agc_xx_0, 0), (self.ham_psk31_detect_0, 0))
+
+        # The audio monitor is only built when asked for.
+        if audio_out:
+            from gnuradio import audio
+            self.blocks_complex_to_real_0 = blocks.complex_to_real(1)
+            self.audio_sink_0 = audio.sink(audio_rate, '', True)
+            self.connect((self.analog_agc_xx_0, 0), (self.blocks_complex_to_real_0, 0))
+            self.connect((self.blocks_complex_to_real_0, 0), (self.audio_sink_0, 0))
+
+    def set_psk_offset(self, psk_offset):
+        self.psk_offset = psk_offset
+        self.freq_xlating_fir_filter_xxx_1.set_center_freq(self.psk_offset)
+
+
+def argument_parser():
+    parser = ArgumentParser(description="Decode PSK31 without a GUI.")
+    parser.add_argument(
+        "--source", choices=["osmosdr", "file", "sigmf", "wav"], default="osmosdr",
+        help="Set input: SDR, complex float IQ file, SigMF recording or WAV file [default=%(default)r]")
+    parser.add_argument(
+        "--path", default="",
+        help="Set input file for file, sigmf and wav sources [default=%(default)r]")
+    parser.add_argument(
+        "--args", default="",
+        help="Set osmosdr device arguments [default=%(default)r]")
+    parser.add_argument(
+        "--samp-rate", dest="samp_rate", type=intx, default=960000,
+        help="Set sample rate of SDR and IQ file input, a multiple of 48 kHz [default=%(default)r]")
+    parser.add_argument(
+        "--center-freq", dest="center_freq", type=eng_float, default=441800000,
+        help="Set SDR centre frequency [default=%(default)r]")
+    parser.add_argument(
+        "--offset", type=eng_float, default=141000,
+        help="Set offset of the 8 kHz audio channel from the centre of the input [default=%(default)r]")
+    parser.add_argument(
+        "--psk-offset", dest="psk_offset", type=eng_float, default=1000,
+        help="Set PSK31 signal offset within the audio channel [default=%(default)r]")
+    parser.add_argument(
+        "--gain", type=eng_float, default=10,
+        help="Set RX gain [default=%(default)r]")
+    parser.add_argument(
+        "--output", default="-",
+        help="Set file to append decoded text to, - for stdout [default=%(default)r]")
+    parser.add_argument(
+        "--audio", dest="audio_out", action="store_true",
+        help="Play the received audio")
+    parser.add_argument(
+        "--skim", type=intx, default=0,
+        help="Decode every signal in the audio channel, up to this many at a time, "
+        "instead of the one at --psk-offset [default=%(default)r]")
+    parser.add_argument(
+        "--afc", action="store_true",
+        help="Tune to the PSK31 signal nearest to --psk-offset, or the strongest one, and follow it")
+    return parser
+
+
+def main(top_block_cls=psk31_rx_headless, options=None):
+    if options is None:
+        options = argument_parser().parse_args()
+    tb = top_block_cls(source=options.source, path=options.path, args=options.args,
+                       samp_rate=options.samp_rate, center_freq=options.center_freq,
+                       offset=options.offset, psk_offset=options.psk_offset,
+                       gain=options.gain, output=options.output, audio_out=options.audio_out,
+                       skim=options.skim, afc=options.afc)
+
+    def sig_handler(sig=None, frame=None):
+        tb.stop()
+        tb.wait()
+
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, sig_handler)
+    signal.signal(signal.SIGTERM, sig_handler)
+
+    tb.start()
+    tb.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -32,8 +32,14 @@ except ImportError:
     pass
 
 # import any pure python here
+from . import varicode
 from .varicode_rx import varicode_rx
+from .varicode_rx_multi import varicode_rx_multi
+from .varicode_rx_soft import varicode_rx_soft
 from .varicode_tx import varicode_tx
 from .chu_decode import chu_decode
 from .dstar_rx import dstar_rx
+from .xlating_decimator import xlating_decimator
+from .psk31_skimmer import psk31_skimmer
+from .psk31_detect import psk31_detect
 #
@@ -21,101 +21,126 @@
 
 
 from __future__ import division
-from __future__ import print_function
 import numpy
+import pmt
 from gnuradio import gr
 
 class chu_decode(gr.sync_block):
     """
-    docstring for block chu_decode
+    Decoder for the CHU time signal.  Each decoded A or B frame is published
+    as a PMT dict on the "frames" message port, along with the offset of
+    its preamble in the input stream.
     """
 
-    start_of_data = numpy.array([1] * 533 + [0], dtype=numpy.int8).tostring() # Preamble
+    start_of_data = numpy.array([1] * 533 + [0], dtype=numpy.int8) # Preamble
     samples_per_bit = 4800 // 300 # Sample rate / baud rate
     samples_in_message = 110 * samples_per_bit
+    # Each byte is a start bit, two BCD digits each sent least significant
+    # bit first, and two stop bits.
+    bit_weights = numpy.array([0, 16, 32, 64, 128, 1, 2, 4, 8, 0, 0])
+    # The preamble is followed by the rest of the first start bit, which
+    # pins down its end when it is searched for with errors.
+    sync_ones = len(start_of_data) - 1
+    sync_len = sync_ones + samples_per_bit
 
-    def __init__(self):
+    def __init__(self, max_errors=32):
         gr.sync_block.__init__(self,
             name="chu_decode",
             in_sig=[numpy.int8],
             out_sig=None)
+        self.max_errors = max_errors
+        self.synced = False
+        self.message_port_register_out(pmt.intern("frames"))
+
+    def set_max_errors(self, max_errors):
+        self.max_errors = max_errors
+
+    def find_preamble(self, in0):
+        """
+        Find the first preamble with at most max_errors wrong samples.
+        Returns its index (or -1), and the number of samples before it that
+        have been ruled out as the start of a preamble.
+        """
+        if len(in0) < self.sync_len:
+            return -1, 0
+
+        # Count the mismatched samples at every offset using running sums
+        sums = numpy.concatenate(([0], numpy.cumsum(in0 != 0)))
+        ones = sums[self.sync_ones:len(in0) - self.samples_per_bit + 1] - sums[:len(in0) - self.sync_len + 1]
+        zeros = sums[self.sync_len:] - sums[self.sync_ones:len(in0) - self.samples_per_bit + 1]
+        errors = self.sync_ones - ones + zeros
+
+        matches = numpy.flatnonzero(errors <= self.max_errors)
+        if len(matches) == 0:
+            return -1, len(errors)
+
+        # Inside a mark longer than the preamble the error count levels off
+        # instead of growing, so the best alignment is only known once the
+        # run of matches has ended.  The data after a real preamble ends the
+        # run well within sync_ones samples, so anything earlier than that
+        # in a run that hasn't ended can be ruled out.
+        first = matches[0]
+        above = numpy.flatnonzero(errors[first:] > self.max_errors)
+        if len(above) == 0:
+            return -1, max(first, len(errors) - self.sync_ones)
+        index = first + numpy.argmin(errors[first : first + above[0]])
+        return index, index
+
+    def decode_frame(self, samples):
+        """
+        Decode the 110 bits of a frame.  Returns a dict of its contents, or
+        None if it could not be decoded.
+        """
+        disc = 2 * samples.reshape(110, self.samples_per_bit).sum(axis=1) - self.samples_per_bit
+        databits = (disc >= 0).reshape(10, 11)
+
+        # Decode bytes
+        valid = (databits[:,0] == 0) & (databits[:,9] == 1) & (databits[:,10] == 1)
+        tenbytes = numpy.where(valid, databits.dot(self.bit_weights), -1).tolist()
+
+        # Decode data
+        if tenbytes[0:5] == tenbytes[5:10] and tenbytes[0] >> 4 == 6:
+            day = (tenbytes[0] & 0x0f) * 100 + (tenbytes[1] >> 4) * 10 + (tenbytes[1] & 0x0f)
+            hour = (tenbytes[2] >> 4) * 10 + (tenbytes[2] & 0x0f)
+            minute = (tenbytes[3] >> 4) * 10 + (tenbytes[3] & 0x0f)
+            second = (tenbytes[4] >> 4) * 10 + (tenbytes[4] & 0x0f)
+            return {"frame": "A", "day": day, "hour": hour, "minute": minute, "second": second}
+        elif tenbytes[0:5] == [x ^ 0xff for x in tenbytes[5:10]]:
+            dut = (tenbytes[0] & 0x0f) / 10.0
+            if (tenbytes[0] & 0x10):
+                dut = -dut
+            lsw = 0
+            if (tenbytes[0] & 0x20):
+                lsw = 1
+            if (tenbytes[0] & 0x40):
+                lsw = -1
+            year = (tenbytes[1] >> 4) * 1000 + (tenbytes[1] & 0x0f) * 100 + (tenbytes[2] >> 4) * 10 + (tenbytes[2] & 0x0f)
+            tt = (tenbytes[3] >> 4) * 10 + (tenbytes[3] & 0x0f)
+            aa = (tenbytes[4] >> 4) * 10 + (tenbytes[4] & 0x0f)
+            return {"frame": "B", "year": year, "leap_second": lsw, "dut1": dut,
+                    "tai_utc": tt, "dst_pattern": aa}
+        return None
 
     def work(self, input_items, output_items):
         in0 = input_items[0]
+        num_consumed = 0
+
+        # Only new samples are searched: everything before a preamble is
+        # consumed as soon as it has been ruled out.
+        if not self.synced:
+            index, num_consumed = self.find_preamble(in0)
+            if index == -1:
+                return num_consumed
+            self.synced = True
+
+        # We found a preamble!  Wait until we have the whole message.
+        frame_len = len(self.start_of_data) + self.samples_in_message
+        if len(in0) < num_consumed + frame_len:
+            return num_consumed
 
-        # Wait until we have enough data for a whole packet
-        if len(in0) < len(self.start_of_data) + self.samples_in_message:
-            return 0
-
-        index = in0.tostring()[0:len(in0) - self.samples_in_message].find(self.start_of_data)
-        if index != -1:
-            # We found a preamble!
-            startoffset = index + len(self.start_of_data)
-            databits = ''
-            for bit in range(110):
-                offset = startoffset + self.samples_per_bit * bit
-                bitsamples = in0[offset : offset + self.samples_per_bit]
-                disc = 0
-                for sample in bitsamples:
-                    disc = disc - 1 + 2 * sample
-                if disc >= 0:
-                    databits += '1'
-                else:
-                    databits += '0'
-
-            # Decode bytes
-            tenbytes = []
-            for x in range(0,110,11):
-                byte = databits[x:x+11]
-                if byte[0] == '0' and byte[9] == '1' and byte[10] == '1':
-                    byteord = 0
-                    for bit in byte[4:0:-1]:
-                        byteord *= 2
-                        if bit == '1':
-                            byteord += 1
-                    for bit in byte[8:4:-1]:
-                        byteord *= 2
-                        if bit == '1':
-                            byteord += 1
-                    tenbytes.append(byteord)
-                else:
-                    print('error', end=" ")
-                    tenbytes.append(-1)
-
-            # Decode data
-            if tenbytes[0:5] == tenbytes[5:10] and tenbytes[0] >> 4 == 6:
-                day = (tenbytes[0] & 0x0f) * 100 + (tenbytes[1] >> 4) * 10 + (tenbytes[1] & 0x0f)
-                hour = (tenbytes[2] >> 4) * 10 + (tenbytes[2] & 0x0f)
-                minute = (tenbytes[3] >> 4) * 10 + (tenbytes[3] & 0x0f)
-                second = (tenbytes[4] >> 4) * 10 + (tenbytes[4] & 0x0f)
-                print("A frame:")
-                print(" Day of year: " + str(day))
-                print(" Current Time: " + str(hour) + ":" + str(minute) + ":" + str(second) + " UTC")
-                print()
-            elif tenbytes[0:5] == [x ^ 0xff for x in tenbytes[5:10]]:
-                dut = (tenbytes[0] & 0x0f) / 10.0
-                if (tenbytes[0] & 0x10):
-                    dut = -dut
-                lsw = 0
-                if (tenbytes[0] & 0x20):
-                    lsw = 1
-                if (tenbytes[0] & 0x40):
-                    lsw = -1
-                year = (tenbytes[1] >> 4) * 1000 + (tenbytes[1] & 0x0f) * 100 + (tenbytes[2] >> 4) * 10 + (tenbytes[2] & 0x0f)
-                tt = (tenbytes[3] >> 4) * 10 + (tenbytes[3] & 0x0f)
-                aa = (tenbytes[4] >> 4) * 10 + (tenbytes[4] & 0x0f)
-                print("B frame:")
-                print(" Year: " + str(year))
-                print(" Leap second warning: " + str(lsw))
-                print(" Difference between UTC and UT1: " + str(dut) + " seconds")
-                print(" Difference between TAI and UTC: " + str(tt) + " seconds")
-                print(" Daylight saving time pattern: " + str(aa))
-                print()
-            else:
-                print("Decoding error.")
-                print()
-
-            return index + len(self.start_of_data) + self.samples_in_message
-
-        # We didn't find a preamble
-        return len(in0) - len(self.start_of_data) - self.samples_in_message
+        frame = self.decode_frame(in0[num_consumed + len(self.start_of_data) : num_consumed + frame_len])
+        if frame is not None:
+            frame["offset"] = self.nitems_read(0) + num_consumed
+            self.message_port_pub(pmt.intern("frames"), pmt.to_pmt(frame))
+        self.synced = False
+        return num_consumed + frame_len
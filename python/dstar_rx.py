@@ -21,169 +21,513 @@
 
 
 from __future__ import print_function
+import itertools
 import numpy
+import pmt
 from gnuradio import gr
 
-class dstar_rx(gr.sync_block):
+# Golay (24,12) code used for the first two words of each voice frame: 12
+# data bits, 11 check bits from the generator polynomial
+# x^11 + x^10 + x^6 + x^5 + x^4 + x^2 + 1, and an overall parity bit.
+GOLAY_POLY = 0xC75
+golay_encode = numpy.arange(4096, dtype=numpy.int64) << 11
+for bit in range(22, 10, -1):
+    golay_encode ^= ((golay_encode >> bit) & 1) * (GOLAY_POLY << (bit - 11))
+golay_encode |= numpy.arange(4096, dtype=numpy.int64) << 11
+golay_parity = numpy.zeros(4096, dtype=numpy.int64)
+for bit in range(23):
+    golay_parity ^= (golay_encode >> bit) & 1
+golay_encode = golay_encode << 1 | golay_parity
+
+def golay_syndrome(word):
+    return (word ^ golay_encode[word >> 12]) & 0xfff
+
+# CRC-CCITT of the header, least significant bit first: polynomial
+# x^16 + x^12 + x^5 + 1, initial value and final XOR 0xffff.  The table
+# gives the CRC update for each byte.
+crc_table = numpy.arange(256)
+for bit in range(8):
+    crc_table = (crc_table >> 1) ^ ((crc_table & 1) * 0x8408)
+crc_table = crc_table.tolist()
+
+def crc_ccitt(data):
+    crc = 0xffff
+    for byte in data:
+        crc = (crc >> 8) ^ crc_table[(crc ^ byte) & 0xff]
+    return crc ^ 0xffff
+
+# Error pattern for each syndrome.  Every pattern of up to three errors has
+# a distinct syndrome; anything else is left uncorrected.
+golay_errors = numpy.zeros(4096, dtype=numpy.int64)
+for weight in range(1, 4):
+    for positions in itertools.combinations(range(24), weight):
+        error = sum(1 << position for position in positions)
+        golay_errors[golay_syndrome(error)] = error
+
+# Scrambling mask for the second word of a voice frame, for each value of
+# the first word: the top bits of 24 steps of a linear congruential
+# generator seeded from it.
+prng_table = numpy.zeros(4096, dtype=numpy.int64)
+pr = numpy.arange(4096, dtype=numpy.int64) << 4
+for bit in range(23, -1, -1):
+    pr = ((173 * pr) + 13849) & 0xFFFF
+    prng_table |= ((pr >> 15) & 1) << bit
+
+# Scrambler sequence of the header and data frames: x^7 + x^4 + 1 from an
+# all-ones state.  It repeats every 127 bits, and a header is the longest
+# run scrambled at once.
+scrambler = numpy.zeros(127, dtype=numpy.int8)
+state = 0b1111111
+for x in range(len(scrambler)):
+    state = ((state << 1) | (((state >> 6) ^ (state >> 3)) & 1)) & 0b1111111
+    scrambler[x] = state & 1
+scrambler = numpy.resize(scrambler, 660)
+
+# Header interleaver: bits are sent by rows of a 24-row table filled by
+# columns, the first 12 rows 28 bits long and the rest 27.
+header_order = numpy.argsort([row + 24 * col for row in range(24)
+                              for col in range(28 if row < 12 else 27)])
+
+# Voice interleaver: bits are sent least significant first within each
+# byte, and the six 12-bit groups of the frame are interleaved bit by bit.
+voice_order = numpy.arange(72)
+voice_order = (voice_order & ~7) | (7 - (voice_order & 7))
+voice_order = voice_order.reshape(12, 6).T.flatten()
+
+# Weight of each bit of a 24-bit codeword, most significant first, and the
+# shift of each byte of a 48-bit AMBE frame.
+word_weights = 1 << numpy.arange(23, -1, -1)
+ambe_shifts = numpy.arange(40, -8, -8)
+
+class slow_data(object):
+    """
+    Reassembler for the slow data sent in the data frames of a voice
+    transmission.  Data frames pair up into six-byte blocks after each sync
+    frame; the high nibble of the first byte gives the type of the block
+    and the low nibble its index or the number of bytes that follow.
+
+    feed() takes the three descrambled bytes of each data frame, and
+    returns ("text", str) when a 20-character message is complete,
+    ("header", bytes) for a resent header with a valid CRC, ("gps", str)
+    for each GPS or DPRS sentence, and None otherwise.
+    """
+
+    TEXT = 0x4
+    HEADER = 0x5
+    GPS = 0x3
+
+    def __init__(self):
+        self.block = numpy.zeros(6, dtype=numpy.uint8)
+        self.text = numpy.zeros(20, dtype=numpy.uint8)
+        self.header = numpy.zeros(41, dtype=numpy.uint8)
+        self.gps = numpy.zeros(256, dtype=numpy.uint8)
+        self.text_blocks = 0
+        self.header_len = 0
+        self.gps_len = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Start a new superframe: the next data frame begins a block.
+        """
+        self.half = False
+
+    def feed(self, data):
+        if not self.half:
+            self.block[0:3] = data
+            self.half = True
+            return None
+        self.block[3:6] = data
+        self.half = False
+
+        kind = self.block[0] >> 4
+        length = self.block[0] & 0xf
+        if kind == self.TEXT:
+            index = length & 0x3
+            self.text[5*index:5*index+5] = self.block[1:6]
+            self.text_blocks |= 1 << index
+            if self.text_blocks == 0xf:
+                self.text_blocks = 0
+                return ("text", self.text.tobytes().decode("ascii", "replace"))
+        elif kind == self.HEADER:
+            # A header is resent as eight full blocks and a short one.
+            length = min(length, 5, len(self.header) - self.header_len)
+            self.header[self.header_len:self.header_len+length] = self.block[1:1+length]
+            self.header_len += length
+            if length < 5:
+                complete = self.header_len == len(self.header)
+                self.header_len = 0
+                if complete and crc_ccitt(self.header[:39]) == self.header[39] | self.header[40] << 8:
+                    return ("header", self.header.tobytes())
+        elif kind == self.GPS:
+            # Sentences end with a carriage return, a line feed or both.
+            sentence = None
+            for byte in self.block[1:1+min(length, 5)]:
+                if byte in (0x0a, 0x0d):
+                    if self.gps_len and sentence is None:
+                        sentence = self.gps[:self.gps_len].tobytes().decode("ascii", "replace")
+                    self.gps_len = 0
+                elif self.gps_len < len(self.gps):
+                    self.gps[self.gps_len] = byte
+                    self.gps_len += 1
+            if sentence is not None:
+                return ("gps", sentence)
+        return None
+
+class dstar_rx(gr.basic_block):
     """
-    docstring for block dstar_rx
+    D-STAR receiver.  The AMBE frame of each received voice frame is
+    output as six bytes, written to a .dst file at path, unless it is None,
+    and published as a u8vector PDU on the "ambe" message port.  The first
+    frame of a transmission is tagged "header", with the header bytes or
+    nil after a late entry, and the last one "eot", true at a terminator
+    and false when sync is lost.  The file is flushed every
+    flush_interval frames (20 ms each).  Slow data messages are published
+    on the "slow_data" port as PMT dicts with a "type" of "text", "header"
+    or "gps" and a "value".
+
+    Headers with a bad CRC are taken as false syncs and ignored, unless
+    require_crc is False.  If verbose is True, headers, each voice frame
+    and the start and end of each transmission are printed to stdout.
     """
 
     VOICE_FRAME_LEN = 72
     DATA_FRAME_LEN  = 24
     TOTAL_FRAME_LEN = 96
+    AMBE_FRAME_LEN  = 6
     INPUT_RATE  = 4800
-    OUTPUT_RATE = 8000
 
-    bit_syn   = numpy.array([1,0]*16, dtype=numpy.int8).tostring()
-    frame_syn = numpy.array([1,1,1,0,1,1,0,0,1,0,1,0,0,0,0], dtype=numpy.int8).tostring()
-    data_sync = numpy.array([1,0]*5 + [1,1,0,1,0,0,0]*2, dtype=numpy.int8).tostring()
-    data_term = "10" * 16 + "000100110101111" + "0"
+    bit_syn   = numpy.array([1,0]*16, dtype=numpy.int8).tobytes()
+    frame_syn = numpy.array([1,1,1,0,1,1,0,0,1,0,1,0,0,0,0], dtype=numpy.int8).tobytes()
+    data_sync = numpy.array([1,0]*5 + [1,1,0,1,0,0,0]*2, dtype=numpy.int8).tobytes()
+    data_term = numpy.array([1,0]*16 + [0,0,0,1,0,0,1,1,0,1,0,1,1,1,1] + [0], dtype=numpy.int8)
 
     HEADER_LEN       = 660
     WHOLE_HEADER_LEN = HEADER_LEN + len(bit_syn) + len(frame_syn)
 
     DTMF_TONES = "123A456B789C*0#D"
 
+    # Header trellis.  The state is the previous two input bits, newest
+    # first.  viterbi_prev gives the two predecessors of each state, and
+    # viterbi_g1/g2 the expected +1/-1 output of each of those branches
+    # for the generators 1 + D + D^2 and 1 + D^2.
+    viterbi_prev = numpy.array([[0, 1], [2, 3], [0, 1], [2, 3]])
+    viterbi_g1 = numpy.array([[-1.0, 1.0], [1.0, -1.0], [1.0, -1.0], [-1.0, 1.0]])
+    viterbi_g2 = numpy.array([[-1.0, 1.0], [-1.0, 1.0], [1.0, -1.0], [1.0, -1.0]])
+    viterbi_identity = numpy.where(numpy.eye(4, dtype=bool), 0.0, -numpy.inf)
+
+    # Every 21st data frame carries data_sync instead of slow data.  The
+    # voice frames are kept aligned to it within MAX_SLIP bits, and the
+    # transmission is dropped after MAX_MISSED_SYNCS missing patterns in a
+    # row.
+    FRAMES_PER_SUPERFRAME = 21
+    MAX_SLIP = 2
+    MAX_MISSED_SYNCS = 1
+    slips = sorted(range(-MAX_SLIP, MAX_SLIP + 1), key=abs)
+
     STATE_IDLE     = 1
     STATE_RX_VOICE = 2
 
     current_state = STATE_IDLE
 
-    def __init__(self):
-        gr.sync_block.__init__(self,
+    def __init__(self, path="dstar-audio.dst", flush_interval=50, require_crc=True, verbose=False):
+        gr.basic_block.__init__(self,
             name="dstar_rx",
             in_sig=[numpy.int8],
-            out_sig=None)
-        self.f = open("dstar-audio.dst", "wb")
-        self.f.write(".dst".encode())
+            out_sig=[numpy.uint8])
+        self.set_output_multiple(self.AMBE_FRAME_LEN)
+        self.f = None
+        if path is not None:
+            self.f = open(path, "wb")
+            self.f.write(".dst".encode())
+        self.flush_interval = flush_interval
+        self.unflushed = 0
+        self.require_crc = require_crc
+        self.verbose = verbose
+        self.message_port_register_out(pmt.intern("ambe"))
+        self.message_port_register_out(pmt.intern("slow_data"))
+
+    def set_flush_interval(self, flush_interval):
+        self.flush_interval = flush_interval
+
+    def set_require_crc(self, require_crc):
+        self.require_crc = require_crc
+
+    def set_verbose(self, verbose):
+        self.verbose = verbose
+
+    def write_ambe(self, ambe):
+        self.message_port_pub(pmt.intern("ambe"),
+                              pmt.cons(pmt.PMT_NIL, pmt.init_u8vector(len(ambe), ambe.tolist())))
+        if self.f is None:
+            return
+        self.f.write(ambe.tobytes())
+        self.unflushed += 1
+        if self.unflushed >= self.flush_interval:
+            self.f.flush()
+            self.unflushed = 0
+
+    def stop(self):
+        if self.f is not None:
+            self.f.flush()
+        return True
 
     def unscramble(self, header):
-        state = 0b1111111 # Initial state
-        poly = 0b10010001 # x^7 + x^4 + 1
-        for x in range(len(header)):
-            state <<= 1
-            state |= ((state >> 7) & 1) ^ ((state >> 4) & 1)
-            state &= 0b1111111
-            header[x] ^= (state & 1)
-        return header
+        if numpy.issubdtype(header.dtype, numpy.floating):
+            # Soft symbols change sign where the scrambler has a one
+            return header * (1 - 2 * scrambler[:len(header)])
+        return header ^ scrambler[:len(header)]
 
     def deinterleave_header(self, header):
-        out_header = numpy.array([0]*self.HEADER_LEN, dtype=numpy.int8)
-        index = 0
-        for row in range(24):
-            for col in range(28 if row < 12 else 27):
-                out_header[row + 24 * col] = header[index]
-                index += 1
-        return out_header
+        return header[header_order]
 
     def viterbi_header(self, header):
-        # TODO: Implement proper Viterbi decode.
-        out_header = numpy.array([0]*(len(header)//2 - 2), dtype=numpy.int8)
-        prev = 0
-        prev_prev = 0
-        for x in range(len(out_header)):
-            out_header[x] = prev_prev ^ prev ^ header[x*2]
-            prev_prev = prev
-            prev = out_header[x]
-        return out_header
+        """
+        Viterbi decode the rate 1/2, K=3 convolutional code of the header.
+        header may be hard bits, or soft symbols (floats, positive for a
+        one) in the same order.
+        """
+        if numpy.issubdtype(header.dtype, numpy.floating):
+            symbols = header.reshape(-1, 2)
+        else:
+            symbols = 2.0 * header.reshape(-1, 2) - 1
+
+        # Metric of every branch of every step, as a matrix from the old
+        # state to the new state
+        metrics = numpy.full((len(symbols), 4, 4), -numpy.inf)
+        metrics[:, numpy.arange(4)[:,None], self.viterbi_prev] = \
+            symbols[:,0,None,None] * self.viterbi_g1 + symbols[:,1,None,None] * self.viterbi_g2
+
+        # Add, compare and select for pairs of neighbouring steps at once,
+        # for all pairs of end states, until the whole header is covered.
+        # Remember the best middle state of each pair.
+        middles = []
+        counts = []
+        while len(metrics) > 1:
+            counts.append(len(metrics))
+            if len(metrics) % 2:
+                metrics = numpy.concatenate((metrics, self.viterbi_identity[None]))
+            later = metrics[1::2]
+            earlier = metrics[0::2]
+            metrics = later[:, :, 0, None] + earlier[:, None, 0, :]
+            middle = numpy.zeros(metrics.shape, dtype=numpy.int8)
+            for state in range(1, 4):
+                candidate = later[:, :, state, None] + earlier[:, None, state, :]
+                better = candidate > metrics
+                metrics[better] = candidate[better]
+                middle[better] = state
+            middles.append(middle)
+
+        # The encoder starts in state zero, and the tail bits return it
+        # there.  Fill in the middle states from the top down.
+        states = numpy.zeros(2, dtype=numpy.int64)
+        for middle, count in zip(reversed(middles), reversed(counts)):
+            new_states = numpy.zeros(2 * len(states) - 1, dtype=numpy.int64)
+            new_states[0::2] = states
+            new_states[1::2] = middle[numpy.arange(len(states) - 1), states[1:], states[:-1]]
+            states = new_states[:count + 1]
+        return (states[1:-2] >> 1).astype(numpy.int8)
 
     def decode_header(self, header):
+        """
+        Decode the received header, as hard bits or soft symbols, to bytes.
+        """
         header = self.unscramble(header)
         header = self.deinterleave_header(header)
         header = self.viterbi_header(header)
-        header = self.reverse_bytes(header.tostring()).replace('\x00','0').replace('\x01','1')
-        header_bytes = ''
-        for x in range(0, len(header), 8):
-            bits = header[x:x+8]
-            header_bytes += chr(int(bits, 2))
-        print("Destination repeater callsign: " + header_bytes[3:11])
-        print("Departure repeater callsign: " + header_bytes[11:19])
-        print("Companion callsign: " + header_bytes[19:27])
-        print("Own callsign 1: " + header_bytes[27:35])
-        print("Own callsign 2: " + header_bytes[35:39])
-        print("CRC: " + header[-16:])
+        return numpy.packbits(header, bitorder='little')
 
-    def prng(self, i):
-        mask = 0x800000
-        prng = 0
-        pr = i << 4
+    def header_crc_ok(self, header_bytes):
+        return crc_ccitt(header_bytes[:39]) == header_bytes[39] | header_bytes[40] << 8
 
-        for x in range(24):
-            pr = ((173 * pr) + 13849) & 0xFFFF;
-            if ((pr & 0x8000) != 0):
-                prng |= mask
-            mask >>= 1
+    def print_header(self, header_bytes):
+        print("Destination repeater callsign: " + self.text(header_bytes[3:11]))
+        print("Departure repeater callsign: " + self.text(header_bytes[11:19]))
+        print("Companion callsign: " + self.text(header_bytes[19:27]))
+        print("Own callsign 1: " + self.text(header_bytes[27:35]))
+        print("Own callsign 2: " + self.text(header_bytes[35:39]))
+        print("CRC: {0:02x}{1:02x}{2}".format(header_bytes[39], header_bytes[40],
+                                              "" if self.header_crc_ok(header_bytes) else " (bad)"))
 
-        return prng
+    def print_frame(self, voice, data):
+        fund_freq = voice >> 41
+        if fund_freq == 124:
+            fund_freq_text = "Silence"
+        elif fund_freq == 126:
+            dtmf_tone = self.DTMF_TONES[((voice >> 34) & 0xc) | ((voice >> 5) & 0x3)]
+            dtmf_ampl = ((voice >> 28) & 0xfc) | ((voice >> 3) & 0x3)
+            fund_freq_text = "DTMF: " + dtmf_tone + " Ampl: " + str(dtmf_ampl)
+        else:
+            fund_freq_text = '{0:03}'.format(fund_freq)
 
-    def reverse_bytes(self, bits):
-        result = ""
-        for x in range(0, len(bits), 8):
-            result += bits[x:x+8][::-1]
-        return result
+        print('{0:048b} {1:08b}{2:08b}{3:08b} {4}'.format(voice, data[0], data[1], data[2], fund_freq_text))
+
+    def text(self, header_bytes):
+        return header_bytes.tobytes().decode("ascii", "replace")
+
+    def prng(self, i):
+        """
+        Scrambling mask for the second word of a voice frame, given the
+        data bits of the first word.  i may also be an array of words, to
+        descramble many frames at once.
+        """
+        return prng_table[i]
 
     def deinterleave_voice(self, bits):
-        return bits[0:72:6] + bits[1:73:6] + bits[2:74:6] + bits[3:75:6] + bits[4:76:6] + bits[5:77:6]
+        """
+        Put the 72 bits of a voice frame, as received, in the order of the
+        three codewords, most significant bit first.
+        """
+        return bits[voice_order]
 
-    def golay(self, bits):
-        # TODO: Implement proper Golay
-        return bits[0:12]
+    def golay(self, word):
+        """
+        Correct up to three errors in a 24-bit Golay codeword, and return
+        its 12 data bits.
+        """
+        return (word ^ golay_errors[golay_syndrome(word)]) >> 12
 
-    def work(self, input_items, output_items):
-        in0 = input_items[0]
+    def find_data_sync(self, in0):
+        """
+        Offset of the sync pattern in the data frame at the start of in0
+        from where it is expected, or None if it is not within MAX_SLIP bits.
+        """
+        for slip in self.slips:
+            start = self.VOICE_FRAME_LEN + slip
+            if in0[start:start + len(self.data_sync)].tobytes() == self.data_sync:
+                return slip
+        return None
 
-        if self.current_state == self.STATE_IDLE:
-            if len(in0) < self.WHOLE_HEADER_LEN:
-                return 0
-
-            index = in0.tostring().find(self.bit_syn + self.frame_syn, 0, -self.HEADER_LEN)
-            if index == -1:
-                self.consume(0, len(in0) - self.WHOLE_HEADER_LEN + 1)
-                return 0
-
-            # We found a header!
-            start_index = index + len(self.bit_syn) + len(self.frame_syn)
-            end_index = start_index + self.HEADER_LEN
-            header = in0[start_index:end_index]
-            self.decode_header(header)
-            self.current_state = self.STATE_RX_VOICE
-            self.consume(0, end_index)
-            return 0
-
-        elif self.current_state == self.STATE_RX_VOICE:
-            if len(in0) < self.VOICE_FRAME_LEN + len(self.data_term):
-                return 0
-
-            # We have enough data for a voice frame & a data frame
-            bits = in0[0:self.VOICE_FRAME_LEN + len(self.data_term)].tostring().replace('\x00','0').replace('\x01','1')
-            bits = self.deinterleave_voice(self.reverse_bytes(bits[0:self.VOICE_FRAME_LEN])) + bits[self.VOICE_FRAME_LEN:]
-
-            first_word = int(bits[0:12], 2)
-            second_code_word = int(bits[24:48], 2) ^ self.prng(first_word)
-
-            voice_bits = self.golay(bits[0:24]) + self.golay('{0:024b}'.format(second_code_word)) + bits[48:72]
-            self.f.write(bytes([int(voice_bits[0:8], 2), int(voice_bits[8:16], 2), int(voice_bits[16:24], 2), int(voice_bits[24:32], 2), int(voice_bits[32:40], 2), int(voice_bits[40:48], 2)]))
-            self.f.flush()
-            data_bits = self.reverse_bytes(self.unscramble(in0[72:96]).tostring().replace('\x00','0').replace('\x01','1'))
-
-            fund_freq = int(voice_bits[0:7], 2)
-            if fund_freq == 124:
-                fund_freq_text = "Silence"
-            elif fund_freq == 126:
-                dtmf_tone = self.DTMF_TONES[int(voice_bits[10:12] + voice_bits[41:43], 2)]
-                dtmf_ampl = int(voice_bits[12:18] + voice_bits[43:45], 2)
-                fund_freq_text = "DTMF: " + dtmf_tone + " Ampl: " + str(dtmf_ampl)
-            else:
-                fund_freq_text = '{0:03}'.format(fund_freq)
+    def start_voice(self, header_bytes):
+        self.current_state = self.STATE_RX_VOICE
+        self.frame_count = 0
+        self.missed_syncs = 0
+        self.slow_data = slow_data()
+        self.first_frame = True
+        if header_bytes is None:
+            self.header_tag = pmt.PMT_NIL
+        else:
+            self.header_tag = pmt.init_u8vector(len(header_bytes), header_bytes.tolist())
+
+    def search(self, in0):
+        """
+        Look for the start of a transmission.  Return the number of input
+        items to consume, or None if more input is needed.
+        """
+        if len(in0) < self.WHOLE_HEADER_LEN:
+            return None
 
-            print(voice_bits + " " + data_bits + " " + fund_freq_text)
+        buf = in0.tobytes()
+        index = buf.find(self.bit_syn + self.frame_syn, 0, -self.HEADER_LEN)
 
-            # Check whether we've reached the end of a transmission:
-            if bits[self.VOICE_FRAME_LEN:] == self.data_term:
-                self.consume(0, self.VOICE_FRAME_LEN + len(self.data_term))
-                self.current_state = self.STATE_IDLE
+        # A transmission already under way can be joined at a sync
+        # pattern, starting with the voice frame before it.
+        end = len(buf) if index == -1 else index + len(self.data_sync) - 1
+        sync_index = buf.find(self.data_sync, self.VOICE_FRAME_LEN, end)
+        if sync_index != -1:
+            if self.verbose:
+                print("Late entry.")
+            self.start_voice(None)
+            return sync_index - self.VOICE_FRAME_LEN
+
+        if index == -1:
+            return len(in0) - self.WHOLE_HEADER_LEN + 1
+
+        # We found a header!
+        start_index = index + len(self.bit_syn) + len(self.frame_syn)
+        end_index = start_index + self.HEADER_LEN
+        header_bytes = self.decode_header(in0[start_index:end_index])
+        if self.require_crc and not self.header_crc_ok(header_bytes):
+            # Most likely a false sync.  Keep searching right after it.
+            return index + 1
+        if self.verbose:
+            self.print_header(header_bytes)
+        self.start_voice(header_bytes)
+        return end_index
+
+    def receive_frame(self, in0, out, offset):
+        """
+        Decode the voice frame at the start of in0 into out, which is tagged
+        at offset.  Return the number of input items to consume, or None if
+        more input is needed.
+        """
+        if len(in0) < self.VOICE_FRAME_LEN + len(self.data_term):
+            return None
+
+        # We have enough data for a voice frame & a data frame
+        words = self.deinterleave_voice(in0[0:self.VOICE_FRAME_LEN]).reshape(3, 24).dot(word_weights)
+        first_word = self.golay(words[0])
+        second_word = self.golay(words[1] ^ self.prng(first_word))
+        voice = (int(first_word) << 36) | (int(second_word) << 24) | int(words[2])
+        out[:] = (voice >> ambe_shifts) & 0xff
+        self.write_ambe(out)
+        if self.first_frame:
+            self.add_item_tag(0, offset, pmt.intern("header"), self.header_tag)
+            self.first_frame = False
+        data = numpy.packbits(self.unscramble(in0[72:96]), bitorder='little')
+
+        if self.verbose:
+            self.print_frame(voice, data)
+
+        # Check whether we've reached the end of a transmission:
+        if numpy.array_equal(in0[self.VOICE_FRAME_LEN:self.VOICE_FRAME_LEN + len(self.data_term)], self.data_term):
+            self.current_state = self.STATE_IDLE
+            self.add_item_tag(0, offset, pmt.intern("eot"), pmt.PMT_T)
+            if self.verbose:
                 print("End of transmission.")
+            return self.VOICE_FRAME_LEN + len(self.data_term)
+
+        if self.frame_count == 0:
+            self.slow_data.reset()
+        else:
+            message = self.slow_data.feed(data)
+            if message is not None:
+                kind, value = message
+                if kind == "header":
+                    value = numpy.frombuffer(value, dtype=numpy.uint8)
+                self.message_port_pub(pmt.intern("slow_data"),
+                                      pmt.to_pmt({"type": kind, "value": value}))
+
+        slip = 0
+        if self.frame_count == 0:
+            slip = self.find_data_sync(in0)
+            if slip is not None:
+                self.missed_syncs = 0
             else:
-                self.consume(0, self.TOTAL_FRAME_LEN)
-            return 160
+                slip = 0
+                self.missed_syncs += 1
+                if self.missed_syncs > self.MAX_MISSED_SYNCS:
+                    self.current_state = self.STATE_IDLE
+                    self.add_item_tag(0, offset, pmt.intern("eot"), pmt.PMT_F)
+                    if self.verbose:
+                        print("Lost sync.")
+        self.frame_count = (self.frame_count + 1) % self.FRAMES_PER_SUPERFRAME
+        return self.TOTAL_FRAME_LEN + slip
+
+    def forecast(self, noutput_items, ninput_items_required):
+        frames = noutput_items // self.AMBE_FRAME_LEN
+        return [max(self.WHOLE_HEADER_LEN, frames * self.TOTAL_FRAME_LEN + len(self.data_term) - self.DATA_FRAME_LEN)]
+
+    def general_work(self, input_items, output_items):
+        in0 = input_items[0]
+        out0 = output_items[0]
+        num_consumed = 0
+        num_produced = 0
+
+        while True:
+            if self.current_state == self.STATE_IDLE:
+                num = self.search(in0[num_consumed:])
+            elif len(out0) - num_produced < self.AMBE_FRAME_LEN:
+                break
+            else:
+                num = self.receive_frame(in0[num_consumed:],
+                                         out0[num_produced:num_produced + self.AMBE_FRAME_LEN],
+                                         self.nitems_written(0) + num_produced)
+                if num is not None:
+                    num_produced += self.AMBE_FRAME_LEN
+            if num is None:
+                break
+            num_consumed += num
+
+        self.consume(0, num_consumed)
+        return num_produced
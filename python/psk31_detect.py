@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+#
+
+import numpy
+import pmt
+from gnuradio import gr
+
+SYMBOL_RATE = 31.25
+MIN_STEP = 1.0 # Hz; smaller corrections are left to the Costas loop
+
+def find_carriers(power, width, threshold):
+    """
+    Find PSK31 signals in a power spectrum with width bins per symbol
+    rate.  Returns the position of each carrier in bins, with sub-bin
+    precision, strongest signal first.
+    """
+    noise = numpy.median(power)
+    if noise <= 0:
+        # Silence, or a signal with no noise floor to measure it against
+        return []
+    excess = numpy.maximum(power - noise, 0)
+    inner = numpy.convolve(excess, numpy.ones(2 * width + 1), 'same')
+    outer = numpy.convolve(excess, numpy.ones(4 * width + 1), 'same')
+    centre = numpy.convolve(excess, numpy.ones(3), 'same')
+
+    carriers = []
+    taken = numpy.zeros(len(power), dtype=bool)
+    for peak in numpy.argsort(-inner):
+        if inner[peak] < threshold * noise * (2 * width + 1):
+            break
+        if taken[peak]:
+            continue
+
+        # The power of an idle signal is in two tones half the symbol rate
+        # either side of the carrier, so the peak can be off centre.
+        carrier = peak
+        for _ in range(2):
+            n = int(round(carrier))
+            bins = numpy.arange(max(n - width, 0), min(n + width + 1, len(power)))
+            carrier = numpy.sum(bins * excess[bins]) / max(numpy.sum(excess[bins]), 1e-30)
+        n = int(round(carrier))
+        taken[max(n - 2 * width, 0):n + 2 * width + 1] = True
+
+        # Steady carriers have most of their power in the centre bins, and
+        # wider signals much of theirs beyond one symbol rate.
+        if centre[n] > 0.95 * inner[n] or inner[n] < 0.8 * outer[n]:
+            continue
+        carriers.append(carrier)
+    return carriers
+
+class psk31_detect(gr.sync_block):
+    """
+    PSK31 carrier detector, for automatic tuning.
+
+    Every interval seconds, a windowed FFT of fft_size samples is taken,
+    and the last history spectra are averaged.  A signal counts as PSK31
+    if nearly all of its power is within one symbol rate of its carrier,
+    at least threshold times the noise floor on average, but not all of it
+    in a single steady tone.  Its carrier is the centroid of that power.
+    The bins must be no wider than a quarter of the symbol rate.
+
+    The frequencies of all signals found between low_freq and high_freq are
+    published on the "carriers" port.  The "freq" port follows the signal
+    nearest to freq, or the strongest one if none is within one symbol
+    rate, and publishes a ("freq", frequency) pair whenever it moves, so
+    a decoder can be retuned through a Message Pair to Var block.
+    """
+    def __init__(self, samp_rate=8000, freq=1000, fft_size=2048, interval=0.5, history=8,
+                 threshold=10.0, low_freq=200, high_freq=2800):
+        gr.sync_block.__init__(self,
+            name="psk31_detect",
+            in_sig=[numpy.complex64],
+            out_sig=None)
+        self.freq = freq
+        self.fft_size = fft_size
+        self.stride = max(fft_size, int(round(interval * samp_rate)))
+        self.threshold = threshold
+        self.window = numpy.hanning(fft_size)
+        bin_freqs = numpy.fft.fftshift(numpy.fft.fftfreq(fft_size, 1.0 / samp_rate))
+        self.band = (bin_freqs >= low_freq) & (bin_freqs <= high_freq)
+        self.low_bin_freq = bin_freqs[self.band][0]
+        self.bin_width = float(samp_rate) / fft_size
+        self.width = int(round(SYMBOL_RATE / self.bin_width))
+        if self.width < 4:
+            raise ValueError("fft_size must give bins of a quarter of the symbol rate or less")
+        self.buffer = numpy.zeros(fft_size, dtype=numpy.complex64)
+        self.spectra = numpy.zeros((history, fft_size))
+        self.num_spectra = 0
+        self.position = 0
+        self.message_port_register_out(pmt.intern("carriers"))
+        self.message_port_register_out(pmt.intern("freq"))
+
+    def set_freq(self, freq):
+        self.freq = freq
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+
+    def update(self):
+        spectrum = numpy.abs(numpy.fft.fft(self.buffer * self.window)) ** 2
+        self.spectra[self.num_spectra % len(self.spectra)] = numpy.fft.fftshift(spectrum)
+        self.num_spectra += 1
+        power = numpy.mean(self.spectra[:self.num_spectra], axis=0)[self.band]
+
+        freqs = [self.low_bin_freq + carrier * self.bin_width
+                 for carrier in find_carriers(power, self.width, self.threshold)]
+        self.message_port_pub(pmt.intern("carriers"), pmt.init_f64vector(len(freqs), freqs))
+        if not freqs:
+            return
+
+        nearest = min(freqs, key=lambda freq: abs(freq - self.freq))
+        freq = nearest if abs(nearest - self.freq) <= SYMBOL_RATE else freqs[0]
+        if abs(freq - self.freq) >= MIN_STEP:
+            self.freq = freq
+            self.message_port_pub(pmt.intern("freq"), pmt.cons(pmt.intern("freq"), pmt.from_double(freq)))
+
+    def work(self, input_items, output_items):
+        in0 = input_items[0]
+        done = 0
+        while done < len(in0):
+            # Only the first fft_size samples of each stride are analysed
+            n = min(len(in0) - done, self.stride - self.position)
+            if self.position < self.fft_size:
+                m = min(n, self.fft_size - self.position)
+                self.buffer[self.position:self.position + m] = in0[done:done + m]
+                if self.position + m == self.fft_size:
+                    self.update()
+            self.position = (self.position + n) % self.stride
+            done += n
+        return len(in0)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+#
+
+import math
+import numpy
+import pmt
+from gnuradio import blocks
+from gnuradio import digital
+from gnuradio import gr
+from gnuradio.fft import window
+from gnuradio.filter import firdes, pfb
+try:
+    from .varicode_rx_multi import varicode_rx_multi
+except ImportError:
+    from varicode_rx_multi import varicode_rx_multi
+
+SYMBOL_RATE = 31.25
+OVERSAMPLE = 8 # samples per symbol at the channelizer output
+
+class channel_select(gr.sync_block):
+    """
+    Route the busiest of several channels to a smaller number of outputs.
+
+    Every interval samples, the power of each channel is compared with the
+    median over all of them, which is taken as the noise floor.  A signal
+    spreads over neighbouring channels, so only a local peak at least
+    threshold times the noise floor is given a free output, and only if
+    neither it nor a neighbour has one already.  It keeps the output until
+    its power falls below half the threshold, or the input goes silent.
+    Outputs are scaled to unit power.  While they have no channel they
+    carry an idle PSK31 signal, a phase reversal every symbol, which
+    decodes to nothing but zeroes.
+    Each change is published on the "channels" port as a dict with the
+    slot and the frequency of its channel, or None once the slot is freed.
+    """
+    def __init__(self, channel_freqs, num_slots, interval, threshold=10.0):
+        gr.sync_block.__init__(self,
+            name="channel_select",
+            in_sig=[numpy.complex64] * len(channel_freqs),
+            out_sig=[numpy.complex64] * num_slots)
+        self.channel_freqs = channel_freqs
+        self.interval = interval
+        self.threshold = threshold
+        self.slots = [None] * num_slots
+        self.scales = numpy.zeros(num_slots)
+        self.power = numpy.zeros(len(channel_freqs))
+        self.count = 0
+        self.message_port_register_out(pmt.intern("channels"))
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+
+    def assign(self, slot, channel):
+        self.slots[slot] = channel
+        freq = None if channel is None else float(self.channel_freqs[channel])
+        self.message_port_pub(pmt.intern("channels"), pmt.to_pmt({"slot": slot, "freq": freq}))
+
+    def update(self, power):
+        noise = numpy.median(power)
+        padded = numpy.concatenate(([0], power, [0]))
+        peaks = (power >= padded[:-2]) & (power > padded[2:])
+
+        # In silence there is no noise floor to measure signals against
+        for slot, channel in enumerate(self.slots):
+            if channel is not None and (noise <= 0 or power[channel] <= 0 or
+                                        power[channel] < noise * self.threshold / 2):
+                self.assign(slot, None)
+        if noise <= 0:
+            return
+        for channel in numpy.argsort(-power):
+            if None not in self.slots or power[channel] < noise * self.threshold:
+                break
+            if peaks[channel] and all(c is None or abs(c - channel) > 1 for c in self.slots):
+                self.assign(self.slots.index(None), int(channel))
+
+        for slot, channel in enumerate(self.slots):
+            if channel is not None:
+                self.scales[slot] = 1 / math.sqrt(power[channel])
+
+    def work(self, input_items, output_items):
+        in0 = numpy.array(input_items)
+        done = 0
+        while done < len(in0[0]):
+            n = min(len(in0[0]) - done, self.interval - self.count)
+            position = self.nitems_written(0) + done + numpy.arange(n)
+            idle = numpy.cos(numpy.pi * position / OVERSAMPLE)
+            for slot, channel in enumerate(self.slots):
+                if channel is None:
+                    output_items[slot][done:done + n] = idle
+                else:
+                    output_items[slot][done:done + n] = in0[channel, done:done + n] * self.scales[slot]
+
+            chunk = in0[:, done:done + n]
+            self.power += numpy.sum(chunk.real ** 2 + chunk.imag ** 2, axis=1)
+            self.count += n
+            done += n
+            if self.count == self.interval:
+                self.update(self.power / self.interval)
+                self.power[:] = 0
+                self.count = 0
+        return len(in0[0])
+
+class psk31_skimmer(gr.hier_block2):
+    """
+    PSK31 skimmer.  A polyphase filterbank splits the input into channels
+    spaced by the symbol rate, and channel_select hands the strongest
+    signals between low_freq and high_freq to num_slots demodulators, which
+    share one varicode decoder.  Text decoded in each slot comes out on the
+    output of the same number, and the "channels" port reports what each
+    slot is tuned to.  Channels are measured every interval seconds.
+    """
+    def __init__(self, samp_rate=8000, num_slots=8, low_freq=200, high_freq=2800, threshold=10.0, interval=1.0):
+        gr.hier_block2.__init__(self,
+            "psk31_skimmer",
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+            gr.io_signature(num_slots, num_slots, gr.sizeof_char))
+        self.message_port_register_hier_out("channels")
+
+        num_channels = int(round(samp_rate / SYMBOL_RATE))
+        if num_channels * SYMBOL_RATE != samp_rate or num_channels % OVERSAMPLE:
+            raise ValueError("sample rate must be a multiple of {0} Hz".format(SYMBOL_RATE * OVERSAMPLE))
+        freqs = numpy.fft.fftfreq(num_channels) * samp_rate
+        used = [k for k in range(num_channels) if low_freq <= freqs[k] <= high_freq]
+        unused = [k for k in range(num_channels) if k not in used]
+
+        # A PSK31 signal is about two channels wide, so each channel passes
+        # it whole when it is within half a channel of the centre.
+        taps = firdes.low_pass(1, samp_rate, 50, 25, window.WIN_HAMMING, 6.76)
+        self.channelizer = pfb.channelizer_ccf(num_channels, taps, OVERSAMPLE)
+        self.select = channel_select(freqs[used], num_slots, int(interval * SYMBOL_RATE * OVERSAMPLE), threshold)
+        self.null_sink = blocks.null_sink(gr.sizeof_gr_complex)
+        self.decoder = varicode_rx_multi(num_slots)
+
+        self.connect(self, self.channelizer)
+        for n, k in enumerate(used):
+            self.connect((self.channelizer, k), (self.select, n))
+        for n, k in enumerate(unused):
+            self.connect((self.channelizer, k), (self.null_sink, n))
+        self.demods = []
+        for slot in range(num_slots):
+            # Same loop bandwidth in Hz as psk31_rx, at half the samples per symbol
+            demod = [digital.costas_loop_cc(math.pi / 10, 2, False),
+                     digital.clock_recovery_mm_cc(OVERSAMPLE, 0.25*0.175*0.175, 0.5, 0.175, 0.005),
+                     digital.diff_phasor_cc(),
+                     blocks.complex_to_real(1),
+                     digital.binary_slicer_fb()]
+            self.connect((self.select, slot), *demod)
+            self.connect(demod[-1], (self.decoder, slot))
+            self.connect((self.decoder, slot), (self, slot))
+            self.demods.append(demod)
+        self.msg_connect(self.select, "channels", self, "channels")
+
+    def set_threshold(self, threshold):
+        self.select.set_threshold(threshold)
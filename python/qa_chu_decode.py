@@ -21,6 +21,8 @@
 
 from gnuradio import gr, gr_unittest
 from gnuradio import blocks
+import pmt
+import random
 from chu_decode import chu_decode
 
 class qa_chu_decode(gr_unittest.TestCase):
@@ -36,6 +38,83 @@ class qa_chu_decode(gr_unittest.TestCase):
         self.tb.run()
         # check data
 
+    def make_frame(self, tenbytes):
+        # Preamble, then each byte as a start bit, two BCD digits sent least
+        # significant bit first, and two stop bits, at 16 samples per bit
+        bits = []
+        for byte in tenbytes:
+            bits += [0] + [(byte >> x) & 1 for x in (4, 5, 6, 7, 0, 1, 2, 3)] + [1, 1]
+        return [0] * 100 + [1] * 533 + [x for x in bits for _ in range(16)] + [0] * 100
+
+    def flip(self, frame, num_preamble, num_data):
+        # Flip num_preamble samples spread over the preamble, and three
+        # samples in each of num_data // 3 bits, which leaves them readable
+        frame = list(frame)
+        for n in range(num_preamble):
+            frame[110 + n * 500 // num_preamble] ^= 1
+        for n in range(num_data // 3):
+            for x in (4, 8, 12):
+                frame[633 + (n + 2) * 16 + x] ^= 1
+        return frame
+
+    def run_errors(self, max_errors, src_data):
+        src = blocks.vector_source_b(src_data)
+        dut = chu_decode()
+        if max_errors is not None:
+            dut.set_max_errors(max_errors)
+        dbg = blocks.message_debug()
+        tb = gr.top_block()
+        tb.connect(src, dut)
+        tb.msg_connect((dut, "frames"), (dbg, "store"))
+        tb.run()
+        return [pmt.to_python(dbg.get_message(n)) for n in range(dbg.num_messages())]
+
+    def test_002_frames(self):
+        a_frame = [0x62, 0x91, 0x23, 0x45, 0x17] * 2
+        b_frame = [0x1a, 0x20, 0x26, 0x37, 0x01, 0xe5, 0xdf, 0xd9, 0xc8, 0xfe]
+        src = blocks.vector_source_b(self.make_frame(a_frame) + self.make_frame(b_frame))
+        dut = chu_decode()
+        dbg = blocks.message_debug()
+        self.tb.connect(src, dut)
+        self.tb.msg_connect((dut, "frames"), (dbg, "store"))
+        self.tb.run()
+
+        self.assertEqual(2, dbg.num_messages())
+        a = pmt.to_python(dbg.get_message(0))
+        self.assertEqual({"frame": "A", "day": 291, "hour": 23, "minute": 45,
+                          "second": 17, "offset": 100}, a)
+        b = pmt.to_python(dbg.get_message(1))
+        self.assertEqual({"frame": "B", "year": 2026, "leap_second": 0, "dut1": -1.0,
+                          "tai_utc": 37, "dst_pattern": 1,
+                          "offset": len(self.make_frame(a_frame)) + 100}, b)
+
+    def test_003_errors(self):
+        # A preamble with up to max_errors wrong samples is found at the
+        # right offset, and one with more is not
+        frame = self.make_frame([0x62, 0x91, 0x23, 0x45, 0x17] * 2)
+        frames = self.run_errors(None, self.flip(frame, 20, 60) + self.flip(frame, 40, 60))
+        self.assertEqual(1, len(frames))
+        self.assertEqual({"frame": "A", "day": 291, "hour": 23, "minute": 45,
+                          "second": 17, "offset": 100}, frames[0])
+
+    def test_004_set_max_errors(self):
+        frame = self.make_frame([0x62, 0x91, 0x23, 0x45, 0x17] * 2)
+        src_data = self.flip(frame, 20, 60) + self.flip(frame, 40, 60)
+        self.assertEqual([], self.run_errors(16, src_data))
+        frames = self.run_errors(48, src_data)
+        self.assertEqual([100, len(frame) + 100], [f["offset"] for f in frames])
+
+    def test_005_long_mark(self):
+        # The mark before the data is usually longer than the preamble, and
+        # only the end of it is a match
+        frame = self.make_frame([0x62, 0x91, 0x23, 0x45, 0x17] * 2)[100:]
+        rng = random.Random(0)
+        for mark_len in (533, 600, 800, 2000):
+            noise = [rng.getrandbits(1) for _ in range(1000)]
+            src_data = noise + [1] * (mark_len - 533) + frame
+            frames = self.run_errors(None, src_data)
+            self.assertEqual([len(noise) + mark_len - 533], [f["offset"] for f in frames])
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_chu_decode)
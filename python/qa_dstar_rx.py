@@ -21,7 +21,11 @@
 
 from gnuradio import gr, gr_unittest
 from gnuradio import blocks
-from dstar_rx import dstar_rx
+import numpy
+import os
+import pmt
+import tempfile
+from dstar_rx import dstar_rx, slow_data, crc_ccitt, golay_encode, header_order, prng_table, scrambler, voice_order
 
 class qa_dstar_rx(gr_unittest.TestCase):
 
@@ -36,6 +40,194 @@ class qa_dstar_rx(gr_unittest.TestCase):
         self.tb.run()
         # check data
 
+    def convolve(self, bits):
+        # Rate 1/2, K=3 encoder with two tail bits
+        out = []
+        prev = prev_prev = 0
+        for bit in list(bits) + [0, 0]:
+            out += [bit ^ prev ^ prev_prev, bit ^ prev_prev]
+            prev_prev = prev
+            prev = bit
+        return numpy.array(out, dtype=numpy.int8)
+
+    def test_002_viterbi(self):
+        dut = dstar_rx(None)
+        bits = numpy.random.randint(0, 2, 328).astype(numpy.int8)
+        header = self.convolve(bits)
+        header[[10, 100, 300, 500]] ^= 1
+        self.assertEqual(list(bits), list(dut.viterbi_header(header)))
+
+        # Soft symbols can outvote a hard error
+        symbols = 2.0 * self.convolve(bits) - 1
+        symbols[[10, 11, 12]] *= -0.1
+        self.assertEqual(list(bits), list(dut.viterbi_header(symbols)))
+
+    def test_003_golay(self):
+        dut = dstar_rx(None)
+        for data in (0x000, 0x5a5, 0xfff):
+            word = int(golay_encode[data])
+            self.assertEqual(data, dut.golay(word))
+            self.assertEqual(data, dut.golay(word ^ 0x800001))
+            self.assertEqual(data, dut.golay(word ^ 0x010204))
+
+    def test_004_prng(self):
+        dut = dstar_rx(None)
+        words = numpy.array([0x000, 0x123, 0xfff])
+        masks = dut.prng(words)
+        for word, mask in zip(words, masks):
+            expected = 0
+            pr = word << 4
+            for x in range(24):
+                pr = ((173 * pr) + 13849) & 0xFFFF
+                expected = (expected << 1) | (pr >> 15)
+            self.assertEqual(expected, mask)
+
+    def test_005_interleave(self):
+        dut = dstar_rx(None)
+        header = numpy.random.randint(0, 2, dut.HEADER_LEN).astype(numpy.int8)
+        self.assertEqual(list(header), list(dut.unscramble(dut.unscramble(header))))
+        self.assertEqual(list(dut.unscramble(numpy.zeros(8, dtype=numpy.int8))),
+                         [0, 0, 0, 0, 1, 1, 1, 0])
+
+        header = numpy.arange(dut.HEADER_LEN)
+        out = dut.deinterleave_header(header)
+        self.assertEqual(list(out[0:3]), [0, 28, 56])
+        self.assertEqual(list(out[24:26]), [1, 29])
+
+        # First received byte, least significant bit first, holds bit 0 of
+        # each of the six groups and bit 1 of the last two
+        frame = numpy.arange(dut.VOICE_FRAME_LEN)
+        out = dut.deinterleave_voice(frame)
+        self.assertEqual([out[i] for i in range(0, 72, 12)], [7, 6, 5, 4, 3, 2])
+        self.assertEqual(list(out[1:2]) + list(out[13:14]), [1, 0])
+
+    def make_transmission(self, header, frames, crc=None):
+        # Sync, then the header with its CRC encoded, interleaved and
+        # scrambled, then each AMBE frame followed by a data frame, and the
+        # terminator
+        bits = [1, 0] * 32 + [1, 1, 1, 0, 1, 1, 0, 0, 1, 0, 1, 0, 0, 0, 0]
+        if crc is None:
+            crc = crc_ccitt(header)
+        header = numpy.array(list(header) + [crc & 0xff, crc >> 8], dtype=numpy.uint8)
+        header = numpy.unpackbits(header, bitorder='little')
+        interleaved = numpy.zeros(dstar_rx.HEADER_LEN, dtype=numpy.int8)
+        interleaved[header_order] = self.convolve(header)
+        bits += list(interleaved ^ scrambler)
+        for n, frame in enumerate(frames):
+            first, second = frame[0] << 4 | frame[1] >> 4, (frame[1] & 0xf) << 8 | frame[2]
+            words = numpy.array([golay_encode[first], golay_encode[second] ^ prng_table[first],
+                                 frame[3] << 16 | frame[4] << 8 | frame[5]])
+            voice = numpy.zeros(dstar_rx.VOICE_FRAME_LEN, dtype=numpy.int8)
+            voice[voice_order] = ((words[:, None] >> numpy.arange(23, -1, -1)) & 1).flatten()
+            bits += list(voice)
+            if n == len(frames) - 1:
+                bits += list(dstar_rx.data_term)
+            elif n % dstar_rx.FRAMES_PER_SUPERFRAME == 0:
+                bits += list(numpy.frombuffer(dstar_rx.data_sync, dtype=numpy.int8))
+            else:
+                bits += [0, 1] * 12
+        return bits + [0] * 1000
+
+    def test_006_ambe(self):
+        header = [0, 0, 0] + list(b"DIRECT  DIRECT  CQCQCQ  VE3IRR  TEST")
+        frames = [[0xf8, 0x0c, 0x31, 0x41, 0x59, 0x26], [0x12, 0x34, 0x56, 0x78, 0x9a, 0xbc]]
+        path = os.path.join(tempfile.mkdtemp(), "test.dst")
+        src = blocks.vector_source_b(self.make_transmission(header, frames))
+        dut = dstar_rx(path, 100)
+        dst = blocks.vector_sink_b()
+        dbg = blocks.message_debug()
+        self.tb.connect(src, dut, dst)
+        self.tb.msg_connect((dut, "ambe"), (dbg, "store"))
+        self.tb.run()
+
+        self.assertEqual(frames[0] + frames[1], list(dst.data()))
+        tags = [(tag.offset, pmt.symbol_to_string(tag.key)) for tag in dst.tags()]
+        self.assertEqual([(0, "header"), (6, "eot")], tags)
+        self.assertEqual(2, dbg.num_messages())
+        for n, frame in enumerate(frames):
+            self.assertEqual(frame, list(pmt.u8vector_elements(pmt.cdr(dbg.get_message(n)))))
+        with open(path, "rb") as f:
+            self.assertEqual(b".dst" + bytes(frames[0] + frames[1]), f.read())
+
+    def test_007_crc(self):
+        self.assertEqual(0x906e, crc_ccitt(b"123456789"))
+
+        # A header with a bad CRC is ignored, unless the check is disabled
+        header = [0, 0, 0] + list(b"DIRECT  DIRECT  CQCQCQ  VE3IRR  TEST")
+        frames = [[0x12, 0x34, 0x56, 0x78, 0x9a, 0xbc]]
+        bits = self.make_transmission(header, frames, crc_ccitt(header) ^ 0x0100)
+        for require_crc, num_frames in ((True, 0), (False, 1)):
+            self.tb = gr.top_block()
+            src = blocks.vector_source_b(bits)
+            dut = dstar_rx(None, require_crc=require_crc)
+            dst = blocks.null_sink(gr.sizeof_char)
+            dbg = blocks.message_debug()
+            self.tb.connect(src, dut, dst)
+            self.tb.msg_connect((dut, "ambe"), (dbg, "store"))
+            self.tb.run()
+            self.assertEqual(num_frames, dbg.num_messages())
+
+    def test_008_data_sync(self):
+        dut = dstar_rx(None)
+        frames = [[0x12, 0x34, 0x56, 0x78, 0x9a, 0xbc]] * 3
+        bits = self.make_transmission([0] * 39, frames)[79 + dut.HEADER_LEN:]
+        self.assertEqual(0, dut.find_data_sync(numpy.array(bits, dtype=numpy.int8)))
+        self.assertEqual(2, dut.find_data_sync(numpy.array([1, 0] + bits, dtype=numpy.int8)))
+        self.assertEqual(-1, dut.find_data_sync(numpy.array(bits[1:], dtype=numpy.int8)))
+        self.assertEqual(None, dut.find_data_sync(numpy.array(bits[dut.TOTAL_FRAME_LEN:], dtype=numpy.int8)))
+
+    def test_009_slow_data(self):
+        header = [0, 0, 0] + list(b"DIRECT  DIRECT  CQCQCQ  VE3IRR  TEST")
+        crc = crc_ccitt(header)
+        header += [crc & 0xff, crc >> 8]
+        data = [[0x40] + list(b"Hello"), [0x41] + list(b" from"),
+                [0x66] * 6, [0x42] + list(b" gr-h"), [0x43] + list(b"am   ")]
+        data += [[0x55] + header[x:x+5] for x in range(0, 40, 5)] + [[0x51, header[40], 0, 0, 0, 0]]
+        data += [[0x35] + list(b"$GPRM"), [0x35] + list(b"C,1\r$"), [0x33] + list(b"GPG\0\0")]
+
+        dec = slow_data()
+        messages = []
+        for block in data:
+            for x in (0, 3):
+                message = dec.feed(numpy.array(block[x:x+3], dtype=numpy.uint8))
+                if message is not None:
+                    messages.append(message)
+        self.assertEqual([("text", "Hello from gr-ham   "), ("header", bytes(header)),
+                          ("gps", "$GPRMC,1")], messages)
+        self.assertEqual(4, dec.gps_len)
+
+    def test_010_late_entry(self):
+        frames = [[n, 0x34, 0x56, 0x78, 0x9a, 0xbc] for n in range(50)]
+        bits = self.make_transmission([0] * 39, frames)
+        # Join after the header and five frames, with an extra bit in the
+        # data frame after voice frame 30
+        bits = [0, 1] * 300 + bits[79 + dstar_rx.HEADER_LEN + 5 * dstar_rx.TOTAL_FRAME_LEN:]
+        bits.insert(600 + 25 * dstar_rx.TOTAL_FRAME_LEN + dstar_rx.VOICE_FRAME_LEN, 1)
+        src = blocks.vector_source_b(bits)
+        dut = dstar_rx(None)
+        dst = blocks.vector_sink_b()
+        self.tb.connect(src, dut, dst)
+        self.tb.run()
+
+        # Frames 21 to 49 are received, and the slip is followed at the
+        # sync frame after voice frame 42
+        data = list(dst.data())
+        self.assertEqual(29 * 6, len(data))
+        self.assertEqual(sum(frames[21:31], []), data[:60])
+        self.assertEqual(sum(frames[43:50], []), data[-42:])
+        tags = [(tag.offset, pmt.symbol_to_string(tag.key)) for tag in dst.tags()]
+        self.assertEqual([(0, "header"), (28 * 6, "eot")], tags)
+
+    def test_011_soft_header(self):
+        # Soft symbols are unscrambled and deinterleaved like hard bits,
+        # and outvote weak errors
+        header = [0, 0, 0] + list(b"DIRECT  DIRECT  CQCQCQ  VE3IRR  TEST")
+        crc = crc_ccitt(header)
+        bits = self.make_transmission(header, [])[79:79 + dstar_rx.HEADER_LEN]
+        symbols = 2.0 * numpy.array(bits) - 1
+        symbols[[10, 11, 12, 300, 301, 302]] *= -0.1
+        dut = dstar_rx(None)
+        self.assertEqual(header + [crc & 0xff, crc >> 8], list(dut.decode_header(symbols)))
 
 if __name__ == '__main__':
     gr_unittest.run(qa_dstar_rx)
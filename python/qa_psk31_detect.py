@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+import numpy
+import pmt
+import varicode
+from psk31_detect import psk31_detect, find_carriers
+
+class qa_psk31_detect(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_002_find_carriers(self):
+        # An idle signal centred on bin 50.5, a steady tone at bin 150 and
+        # a wide signal at bin 250, over a flat noise floor
+        power = numpy.ones(300)
+        power[[46, 55]] = 100
+        power[150] = 1000
+        power[220:281] = 50
+        self.assertEqual([50.5], find_carriers(power, 8, 10.0))
+        self.assertEqual([], find_carriers(numpy.zeros(300), 8, 10.0))
+
+    def test_003_afc(self):
+        # A PSK31 signal at 1003 Hz sending text, next to a steady carrier
+        bits, _ = varicode.encode_bytes(numpy.frombuffer(b"the quick brown fox jumps over the lazy dog " * 4, dtype=numpy.uint8))
+        symbols = numpy.concatenate(([1], numpy.cumprod(numpy.where(bits == 1, 1, -1))))
+        shape = (1 + numpy.cos(numpy.pi * numpy.arange(256) / 256)) / 2
+        baseband = (numpy.outer(symbols[:-1], shape) + numpy.outer(symbols[1:], 1 - shape)).flatten()
+        t = numpy.arange(len(baseband)) / 8000.0
+        rng = numpy.random.RandomState(1)
+        signal = (baseband * numpy.exp(2j * numpy.pi * 1003 * t) + numpy.exp(2j * numpy.pi * 2000 * t) +
+                  0.05 * (rng.standard_normal(len(t)) + 1j * rng.standard_normal(len(t))))
+
+        dut = psk31_detect(8000, 1010)
+        carriers = blocks.message_debug()
+        freq = blocks.message_debug()
+        self.tb.connect(blocks.vector_source_c(signal.astype(numpy.complex64)), dut)
+        self.tb.msg_connect((dut, "carriers"), (carriers, "store"))
+        self.tb.msg_connect((dut, "freq"), (freq, "store"))
+        self.tb.run()
+
+        found = pmt.f64vector_elements(carriers.get_message(carriers.num_messages() - 1))
+        self.assertEqual(1, len(found))
+        self.assertAlmostEqual(1003, found[0], delta=1)
+        self.assertEqual(1, freq.num_messages())
+        msg = freq.get_message(0)
+        self.assertEqual("freq", pmt.symbol_to_string(pmt.car(msg)))
+        self.assertAlmostEqual(1003, pmt.to_double(pmt.cdr(msg)), delta=1)
+
+    def test_004_silence(self):
+        # Silent input has no carriers and leaves the frequency alone
+        dut = psk31_detect(8000, 1010)
+        carriers = blocks.message_debug()
+        freq = blocks.message_debug()
+        self.tb.connect(blocks.vector_source_c([0] * 16000), dut)
+        self.tb.msg_connect((dut, "carriers"), (carriers, "store"))
+        self.tb.msg_connect((dut, "freq"), (freq, "store"))
+        self.tb.run()
+
+        self.assertEqual(4, carriers.num_messages())
+        for n in range(carriers.num_messages()):
+            self.assertEqual(0, len(pmt.f64vector_elements(carriers.get_message(n))))
+        self.assertEqual(0, freq.num_messages())
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_psk31_detect)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+import numpy
+import pmt
+import varicode
+from psk31_skimmer import psk31_skimmer, channel_select
+
+class qa_psk31_skimmer(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_002_select(self):
+        # Channel 3 is strongest but channel 4 is its neighbour; channel 1
+        # is a separate signal, and channel 6 is too weak.
+        levels = [0.1, 1.0, 0.1, 2.0, 1.5, 0.1, 0.2, 0.1]
+        dut = channel_select([100.0 * n for n in range(len(levels))], 3, 10)
+        dsts = []
+        for channel, level in enumerate(levels):
+            self.tb.connect(blocks.vector_source_c([level] * 30), (dut, channel))
+        for slot in range(3):
+            dst = blocks.vector_sink_c()
+            self.tb.connect((dut, slot), dst)
+            dsts.append(dst)
+        dbg = blocks.message_debug()
+        self.tb.msg_connect((dut, "channels"), (dbg, "store"))
+        self.tb.run()
+
+        self.assertEqual(2, dbg.num_messages())
+        self.assertEqual({"slot": 0, "freq": 300.0}, pmt.to_python(dbg.get_message(0)))
+        self.assertEqual({"slot": 1, "freq": 100.0}, pmt.to_python(dbg.get_message(1)))
+        # Until then, and on the free slot, a reversal every eight samples
+        idle = numpy.cos(numpy.pi * numpy.arange(30) / 8)
+        self.assertFloatTuplesAlmostEqual(numpy.concatenate((idle[:10], [1] * 20)), dsts[0].data(), 5)
+        self.assertFloatTuplesAlmostEqual(numpy.concatenate((idle[:10], [1] * 20)), dsts[1].data(), 5)
+        self.assertFloatTuplesAlmostEqual(idle, dsts[2].data(), 5)
+
+    def test_005_silence(self):
+        # Channels are released when the input goes silent
+        levels = [0.1, 1.0, 0.1, 2.0, 1.5, 0.1, 0.2, 0.1]
+        dut = channel_select([100.0 * n for n in range(len(levels))], 3, 10)
+        for channel, level in enumerate(levels):
+            self.tb.connect(blocks.vector_source_c([level] * 10 + [0] * 20), (dut, channel))
+        dst = blocks.vector_sink_c()
+        self.tb.connect((dut, 0), dst)
+        for slot in range(1, 3):
+            self.tb.connect((dut, slot), blocks.null_sink(gr.sizeof_gr_complex))
+        dbg = blocks.message_debug()
+        self.tb.msg_connect((dut, "channels"), (dbg, "store"))
+        self.tb.run()
+
+        self.assertEqual([{"slot": 0, "freq": 300.0}, {"slot": 1, "freq": 100.0},
+                          {"slot": 0, "freq": None}, {"slot": 1, "freq": None}],
+                         [pmt.to_python(dbg.get_message(n)) for n in range(dbg.num_messages())])
+        idle = numpy.cos(numpy.pi * numpy.arange(30) / 8)
+        self.assertFloatTuplesAlmostEqual(numpy.concatenate((idle[:10], [0] * 10, idle[20:])), dst.data(), 5)
+
+    def psk31(self, text, freq, amplitude, samp_rate=8000):
+        # Differentially encoded BPSK at 31.25 baud, with cosine shaped
+        # phase reversals, after two seconds of idle
+        bits, _ = varicode.encode_bytes(numpy.frombuffer(text, dtype=numpy.uint8))
+        bits = numpy.concatenate(([0] * 64, bits, [0] * 64))
+        symbols = numpy.cumprod(numpy.where(bits == 1, 1, -1))
+        symbols = numpy.concatenate(([1], symbols))
+        samples_per_symbol = int(samp_rate / 31.25)
+        shape = (1 + numpy.cos(numpy.pi * numpy.arange(samples_per_symbol) / samples_per_symbol)) / 2
+        baseband = (numpy.outer(symbols[:-1], shape) + numpy.outer(symbols[1:], 1 - shape)).flatten()
+        t = numpy.arange(len(baseband)) / samp_rate
+        return amplitude * baseband * numpy.exp(2j * numpy.pi * freq * t)
+
+    def test_003_skim(self):
+        # Two signals, one of them away from the centre of its channel
+        a = self.psk31(b"CQ CQ CQ de VE3IRR VE3IRR pse k\n", 1000, 1.0)
+        b = self.psk31(b"hello from the other signal 73\n", 1507, 0.5)
+        signal = numpy.zeros(max(len(a), len(b)), dtype=numpy.complex64)
+        signal[:len(a)] += a
+        signal[:len(b)] += b
+        rng = numpy.random.RandomState(1)
+        signal += 0.05 * (rng.standard_normal(len(signal)) + 1j * rng.standard_normal(len(signal)))
+
+        dut = psk31_skimmer(8000, 2)
+        self.tb.connect(blocks.vector_source_c(signal), dut)
+        dsts = []
+        for slot in range(2):
+            dst = blocks.vector_sink_b()
+            self.tb.connect((dut, slot), dst)
+            dsts.append(dst)
+        dbg = blocks.message_debug()
+        self.tb.msg_connect((dut, "channels"), (dbg, "store"))
+        self.tb.run()
+
+        self.assertEqual({"slot": 0, "freq": 1000.0}, pmt.to_python(dbg.get_message(0)))
+        self.assertEqual({"slot": 1, "freq": 1500.0}, pmt.to_python(dbg.get_message(1)))
+        self.assertIn(b"CQ CQ CQ de VE3IRR VE3IRR pse k\n", bytes(bytearray(dsts[0].data())))
+        self.assertIn(b"hello from the other signal 73\n", bytes(bytearray(dsts[1].data())))
+
+    def test_004_idle_slots(self):
+        # One signal for long enough to fill the smallest buffers many
+        # times over, with more slots than signals.  The free slots decode
+        # nothing and must not hold up the one in use.
+        text = b"CQ CQ CQ de VE3IRR VE3IRR pse k\n"
+        signal = self.psk31(text * 40, 1000, 1.0).astype(numpy.complex64)
+        rng = numpy.random.RandomState(2)
+        signal += 0.05 * (rng.standard_normal(len(signal)) + 1j * rng.standard_normal(len(signal)))
+
+        dut = psk31_skimmer(8000, 4)
+        dut.set_max_output_buffer(1)
+        self.tb.connect(blocks.vector_source_c(signal), dut)
+        dsts = []
+        for slot in range(4):
+            dst = blocks.vector_sink_b()
+            self.tb.connect((dut, slot), dst)
+            dsts.append(dst)
+        self.tb.run()
+
+        self.assertGreaterEqual(bytes(bytearray(dsts[0].data())).count(text), 39)
+        for slot in range(1, 4):
+            self.assertEqual([], list(dsts[slot].data()))
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_psk31_skimmer)
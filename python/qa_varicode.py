@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import numpy
+import unittest
+import varicode
+
+class qa_varicode(unittest.TestCase):
+
+    def test_001_round_trip(self):
+        # Every 7-bit character survives encoding and decoding
+        data = bytes(range(128))
+        bits = varicode.encoder().encode(data)
+        self.assertEqual(data, varicode.decoder().feed(bits))
+
+    def test_002_chunks(self):
+        # Codewords may be split across calls to feed()
+        bits = varicode.encoder().encode(b"CQ CQ de VE3IRR")
+        dec = varicode.decoder()
+        result = b"".join(dec.feed(bits[x:x+3]) for x in range(0, len(bits), 3))
+        self.assertEqual(b"CQ CQ de VE3IRR", result)
+
+    def test_003_overlong(self):
+        # A codeword that is too long is dropped, however long it gets
+        dec = varicode.decoder()
+        self.assertEqual(b"", dec.feed([1,0] * 50 + [1]))
+        self.assertEqual(b"", dec.feed([0,0,1,1]))
+        self.assertEqual(b"e", dec.feed([0,0]))
+
+    def test_004_soft(self):
+        # Soft decisions agree with hard decisions on a clean signal
+        bits = varicode.encoder().encode(b"CQ CQ de VE3IRR")
+        decoded, num_consumed = varicode.decode_symbols(2.0 * bits - 1, 100)
+        self.assertEqual(b"CQ CQ de VE3IRR", decoded.astype("uint8").tobytes())
+        self.assertEqual(len(bits), num_consumed)
+
+    def test_005_overlong_bits(self):
+        # A run of ones longer than the input is consumed bit by bit, and
+        # never decoded, whatever its length when it finally ends
+        bits = numpy.ones(4096, dtype=numpy.int8)
+        (decoded,), (num_consumed,) = varicode.decode_bits([bits], [100])
+        self.assertEqual(0, len(decoded))
+        self.assertGreater(num_consumed, 4000)
+        bits = numpy.concatenate((bits[num_consumed:], [0, 0, 1, 1, 0, 0]))
+        (decoded,), (num_consumed,) = varicode.decode_bits([bits], [100])
+        self.assertEqual([ord('e')], list(decoded))
+        self.assertEqual(len(bits), num_consumed)
+
+
+if __name__ == '__main__':
+    unittest.main()
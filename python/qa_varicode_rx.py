@@ -36,6 +36,18 @@ class qa_varicode_rx(gr_unittest.TestCase):
         self.tb.run()
         # check data
 
+    def test_002_batch(self):
+        # 'a', 'e', 't' separated by runs of zeroes, then an incomplete 'a'
+        src_data = (0,0,1,0,1,1,0,0,1,1,0,0,0,0,1,0,1,0,0,1,0,1,1,0)
+        expected_result = [ord('a'), ord('e'), ord('t')]
+        src = blocks.vector_source_b(src_data)
+        dut = varicode_rx()
+        dst = blocks.vector_sink_b()
+        self.tb.connect(src, dut)
+        self.tb.connect(dut, dst)
+        self.tb.run()
+        self.assertEqual(expected_result, list(dst.data()))
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_varicode_rx)
@@ -36,6 +36,18 @@ class qa_varicode_tx(gr_unittest.TestCase):
         self.tb.run()
         # check data
 
+    def test_002_encode(self):
+        # Bytes without a codeword are skipped
+        src_data = [ord('a'), 0x80, ord('e'), ord('t')]
+        expected_result = [1,0,1,1,0,0, 1,1,0,0, 1,0,1,0,0]
+        src = blocks.vector_source_b(src_data)
+        dut = varicode_tx()
+        dst = blocks.vector_sink_b()
+        self.tb.connect(src, dut)
+        self.tb.connect(dut, dst)
+        self.tb.run()
+        self.assertEqual(expected_result, list(dst.data()))
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_varicode_tx)
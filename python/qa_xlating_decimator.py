@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+import numpy
+from xlating_decimator import xlating_decimator, stage_decimations
+
+class qa_xlating_decimator(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_001_stages(self):
+        self.assertEqual([5, 5], stage_decimations(25))
+        self.assertEqual([5, 2, 2], stage_decimations(20))
+        self.assertEqual([], stage_decimations(1))
+
+    def tone_level(self, freq, out_freq):
+        # Level at out_freq of the output for a tone at freq
+        samp_rate = 240000
+        t = numpy.arange(samp_rate // 2) / samp_rate
+        src = blocks.vector_source_c(numpy.exp(2j * numpy.pi * freq * t).astype(numpy.complex64))
+        dut = xlating_decimator(samp_rate, 20, 30000, 2000, 1000)
+        dst = blocks.vector_sink_c()
+        self.tb = gr.top_block()
+        self.tb.connect(src, dut, dst)
+        self.tb.run()
+        out = numpy.array(dst.data())[-3000:]
+        t = numpy.arange(len(out)) / 12000.0
+        return abs(numpy.mean(out * numpy.exp(-2j * numpy.pi * out_freq * t)))
+
+    def test_002_filter(self):
+        # The band around 30 kHz comes out at zero, while signals outside
+        # it, and their aliases, are rejected.
+        self.assertAlmostEqual(1.0, self.tone_level(30500, 500), 2)
+        self.assertLess(self.tone_level(35000, 5000), 0.01)
+        self.assertLess(self.tone_level(42500, 500), 0.01)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_xlating_decimator)
@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014,2020,2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+"""
+Varicode encoding and decoding, as used by PSK31.  This module does not
+depend on GNU Radio, so it can be used to process recorded bit streams
+offline as well as by the varicode_rx and varicode_tx blocks.
+"""
+
+import numpy
+
+MAX_CODE_LEN = 10
+
+encode = {
+    '\x00' : '1010101011',   '\x01' : '1011011011',
+    '\x02' : '1011101101',   '\x03' : '1101110111',
+    '\x04' : '1011101011',   '\x05' : '1101011111',
+    '\x06' : '1011101111',   '\x07' : '1011111101',
+    '\x08' : '1011111111',   '\x09' : '11101111',
+    '\x0A' : '11101',        '\x0B' : '1101101111',
+    '\x0C' : '1011011101',   '\x0D' : '11111',
+    '\x0E' : '1101110101',   '\x0F' : '1110101011',
+    '\x10' : '1011110111',   '\x11' : '1011110101',
+    '\x12' : '1110101101',   '\x13' : '1110101111',
+    '\x14' : '1101011011',   '\x15' : '1101101011',
+    '\x16' : '1101101101',   '\x17' : '1101010111',
+    '\x18' : '1101111011',   '\x19' : '1101111101',
+    '\x1A' : '1110110111',   '\x1B' : '1101010101',
+    '\x1C' : '1101011101',   '\x1D' : '1110111011',
+    '\x1E' : '1011111011',   '\x1F' : '1101111111',
+    ' '    : '1',            '!'    : '111111111',
+    '"'    : '101011111',    '#'    : '111110101',
+    '$'    : '111011011',    '%'    : '1011010101',
+    '&'    : '1010111011',   '\''   : '101111111',
+    '('    : '11111011',     ')'    : '11110111',
+    '*'    : '101101111',    '+'    : '111011111',
+    ','    : '1110101',      '-'    : '110101',
+    '.'    : '1010111',      '/'    : '110101111',
+    '0'    : '10110111',     '1'    : '10111101',
+    '2'    : '11101101',     '3'    : '11111111',
+    '4'    : '101110111',    '5'    : '101011011',
+    '6'    : '101101011',    '7'    : '110101101',
+    '8'    : '110101011',    '9'    : '110110111',
+    ':'    : '11110101',     ';'    : '110111101',
+    '<'    : '111101101',    '='    : '1010101',
+    '>'    : '111010111',    '?'    : '1010101111',
+    '@'    : '1010111101',   'A'    : '1111101',
+    'B'    : '11101011',     'C'    : '10101101',
+    'D'    : '10110101',     'E'    : '1110111',
+    'F'    : '11011011',     'G'    : '11111101',
+    'H'    : '101010101',    'I'    : '1111111',
+    'J'    : '111111101',    'K'    : '101111101',
+    'L'    : '11010111',     'M'    : '10111011',
+    'N'    : '11011101',     'O'    : '10101011',
+    'P'    : '11010101',     'Q'    : '111011101',
+    'R'    : '10101111',     'S'    : '1101111',
+    'T'    : '1101101',      'U'    : '101010111',
+    'V'    : '110110101',    'W'    : '101011101',
+    'X'    : '101110101',    'Y'    : '101111011',
+    'Z'    : '1010101101',   '['    : '111110111',
+    '\\'   : '111101111',    ']'    : '111111011',
+    '^'    : '1010111111',   '_'    : '101101101',
+    '`'    : '1011011111',   'a'    : '1011',
+    'b'    : '1011111',      'c'    : '101111',
+    'd'    : '101101',       'e'    : '11',
+    'f'    : '111101',       'g'    : '1011011',
+    'h'    : '101011',       'i'    : '1101',
+    'j'    : '111101011',    'k'    : '10111111',
+    'l'    : '11011',        'm'    : '111011',
+    'n'    : '1111',         'o'    : '111',
+    'p'    : '111111',       'q'    : '110111111',
+    'r'    : '10101',        's'    : '10111',
+    't'    : '101',          'u'    : '110111',
+    'v'    : '1111011',      'w'    : '1101011',
+    'x'    : '11011111',     'y'    : '1011101',
+    'z'    : '111010101',    '{'    : '1010110111',
+    '|'    : '110111011',    '}'    : '1010110101',
+    '~'    : '1011010111',   '\x7F' : '1110110101' }
+
+decode = {
+    '1010101011' : '\x00',    '1011011011' : '\x01',
+    '1011101101' : '\x02',    '1101110111' : '\x03',
+    '1011101011' : '\x04',    '1101011111' : '\x05',
+    '1011101111' : '\x06',    '1011111101' : '\x07',
+    '1011111111' : '\x08',    '11101111'   : '\x09',
+    '11101'      : '\x0A',    '1101101111' : '\x0B',
+    '1011011101' : '\x0C',    '11111'      : '\x0D',
+    '1101110101' : '\x0E',    '1110101011' : '\x0F',
+    '1011110111' : '\x10',    '1011110101' : '\x11',
+    '1110101101' : '\x12',    '1110101111' : '\x13',
+    '1101011011' : '\x14',    '1101101011' : '\x15',
+    '1101101101' : '\x16',    '1101010111' : '\x17',
+    '1101111011' : '\x18',    '1101111101' : '\x19',
+    '1110110111' : '\x1A',    '1101010101' : '\x1B',
+    '1101011101' : '\x1C',    '1110111011' : '\x1D',
+    '1011111011' : '\x1E',    '1101111111' : '\x1F',
+    '1'          : ' ',       '111111111'  : '!',
+    '101011111'  : '"',       '111110101'  : '#',
+    '111011011'  : '$',       '1011010101' : '%',
+    '1010111011' : '&',       '101111111'  : '\'',
+    '11111011'   : '(',       '11110111'   : ')',
+    '101101111'  : '*',       '111011111'  : '+',
+    '1110101'    : ',',       '110101'     : '-',
+    '1010111'    : '.',       '110101111'  : '/',
+    '10110111'   : '0',       '10111101'   : '1',
+    '11101101'   : '2',       '11111111'   : '3',
+    '101110111'  : '4',       '101011011'  : '5',
+    '101101011'  : '6',       '110101101'  : '7',
+    '110101011'  : '8',       '110110111'  : '9',
+    '11110101'   : ':',       '110111101'  : ';',
+    '111101101'  : '<',       '1010101'    : '=',
+    '111010111'  : '>',       '1010101111' : '?',
+    '1010111101' : '@',       '1111101'    : 'A',
+    '11101011'   : 'B',       '10101101'   : 'C',
+    '10110101'   : 'D',       '1110111'    : 'E',
+    '11011011'   : 'F',       '11111101'   : 'G',
+    '101010101'  : 'H',       '1111111'    : 'I',
+    '111111101'  : 'J',       '101111101'  : 'K',
+    '11010111'   : 'L',       '10111011'   : 'M',
+    '11011101'   : 'N',       '10101011'   : 'O',
+    '11010101'   : 'P',       '111011101'  : 'Q',
+    '10101111'   : 'R',       '1101111'    : 'S',
+    '1101101'    : 'T',       '101010111'  : 'U',
+    '110110101'  : 'V',       '101011101'  : 'W',
+    '101110101'  : 'X',       '101111011'  : 'Y',
+    '1010101101' : 'Z',       '111110111'  : '[',
+    '111101111'  : '\\',      '111111011'  : ']',
+    '1010111111' : '^',       '101101101'  : '_',
+    '1011011111' : '`',       '1011'       : 'a',
+    '1011111'    : 'b',       '101111'     : 'c',
+    '101101'     : 'd',       '11'         : 'e',
+    '111101'     : 'f',       '1011011'    : 'g',
+    '101011'     : 'h',       '1101'       : 'i',
+    '111101011'  : 'j',       '10111111'   : 'k',
+    '11011'      : 'l',       '111011'     : 'm',
+    '1111'       : 'n',       '111'        : 'o',
+    '111111'     : 'p',       '110111111'  : 'q',
+    '10101'      : 'r',       '10111'      : 's',
+    '101'        : 't',       '110111'     : 'u',
+    '1111011'    : 'v',       '1101011'    : 'w',
+    '11011111'   : 'x',       '1011101'    : 'y',
+    '111010101'  : 'z',       '1010110111' : '{',
+    '110111011'  : '|',       '1010110101' : '}',
+    '1011010111' : '~',       '1110110101' : '\x7F' }
+
+# Every codeword starts with a 1, so its value alone identifies it.  This
+# table maps packed codeword values to characters, or -1 if invalid.
+decode_table = numpy.full(1 << MAX_CODE_LEN, -1, dtype=numpy.int16)
+for code, character in decode.items():
+    decode_table[int(code, 2)] = ord(character)
+
+# Flattened codewords (each followed by '00') for all 256 byte values, with
+# the offset and length of each one.  Bytes that cannot be encoded have
+# zero length.
+encode_lengths = numpy.zeros(256, dtype=numpy.int64)
+for character, code in encode.items():
+    encode_lengths[ord(character)] = len(code) + 2
+encode_offsets = numpy.cumsum(encode_lengths) - encode_lengths
+encode_bits = numpy.zeros(encode_lengths.sum(), dtype=numpy.int8)
+for character, code in encode.items():
+    offset = encode_offsets[ord(character)]
+    encode_bits[offset:offset + len(code)] = [int(bit) for bit in code]
+
+# Every codeword followed by '00' as +1/-1 symbols for soft decoding,
+# grouped by length.  Row r of soft_codebook[n] is the symbols of the
+# n-symbol codeword for character soft_characters[n][r].
+soft_characters = {}
+soft_codebook = {}
+for character, code in sorted(encode.items()):
+    symbols = [1.0 if bit == '1' else -1.0 for bit in code + '00']
+    soft_characters.setdefault(len(symbols), []).append(ord(character))
+    soft_codebook.setdefault(len(symbols), []).append(symbols)
+for length in soft_codebook:
+    soft_characters[length] = numpy.array(soft_characters[length])
+    soft_codebook[length] = numpy.array(soft_codebook[length])
+
+def encode_bytes(data, max_bits=None):
+    """
+    Encode a byte array as varicode bits, each codeword followed by '00'.
+
+    Bytes without a codeword are skipped.  If max_bits is given, only as
+    many whole bytes as fit are encoded.  Returns the bits and the number
+    of bytes used.
+    """
+    codes = numpy.asarray(data).astype(numpy.uint8)
+    lengths = encode_lengths[codes]
+    ends = numpy.cumsum(lengths)
+    if max_bits is None:
+        num_consumed = len(codes)
+    else:
+        num_consumed = numpy.searchsorted(ends, max_bits, side='right')
+    num_bits = ends[num_consumed - 1] if num_consumed > 0 else 0
+
+    # Copy each codeword from the table to its place in the output
+    lengths = lengths[:num_consumed]
+    starts = ends[:num_consumed] - lengths
+    index = numpy.arange(num_bits) + numpy.repeat(encode_offsets[codes[:num_consumed]] - starts, lengths)
+    return encode_bits[index], num_consumed
+
+def decode_bits(channels, max_chars):
+    """
+    Decode the complete varicode characters in several bit streams at once.
+
+    channels is a list of bit arrays and max_chars gives the number of
+    characters that may be decoded from each.  Returns a list of arrays of
+    decoded characters, and an array of the number of bits used from each
+    stream.
+    """
+    lengths = numpy.array([len(bits) for bits in channels], dtype=numpy.int64)
+    offsets = numpy.cumsum(lengths) - lengths
+    ones = numpy.flatnonzero(numpy.concatenate(channels))
+    if len(ones) == 0:
+        return [numpy.zeros(0, dtype=numpy.int16)] * len(channels), lengths
+    channel = numpy.searchsorted(offsets, ones, side='right') - 1
+
+    # Every codeword starts and ends with a 1 and contains no '00', so
+    # codewords are the runs of bits between two or more zeroes.  Their
+    # boundaries can be found from the positions of the ones alone.
+    is_end = numpy.ones(len(ones), dtype=bool)
+    is_end[:-1] = (numpy.diff(ones) > 2) | (numpy.diff(channel) != 0)
+    breaks = numpy.flatnonzero(is_end[:-1])
+    starts = ones[numpy.concatenate(([0], breaks + 1))]
+    ends = ones[is_end]
+    word_channel = channel[is_end]
+
+    # Pack each codeword into an integer by summing the weights of its
+    # ones, then look it up.  Overlong codewords are never valid.
+    word = numpy.concatenate(([0], numpy.cumsum(is_end[:-1])))
+    shift = numpy.minimum(ends[word] - ones, MAX_CODE_LEN)
+    values = numpy.bincount(word, weights=numpy.left_shift(1, shift)).astype(numpy.int64)
+    characters = numpy.where(ends - starts < MAX_CODE_LEN,
+                             decode_table[numpy.minimum(values, len(decode_table) - 1)], -1)
+
+    # A codeword is only complete once it is followed by '00'
+    channel_ends = offsets + lengths
+    complete = ends + 2 < channel_ends[word_channel]
+
+    # Take as many complete codewords from each stream as there is room for
+    valid = complete & (characters >= 0)
+    count = numpy.cumsum(valid)
+    first_word = numpy.searchsorted(word_channel, numpy.arange(len(channels)))
+    count -= numpy.concatenate(([0], count))[first_word][word_channel]
+    taken = complete & (count <= numpy.asarray(max_chars)[word_channel])
+
+    # Consume everything up to the start of the next codeword in each
+    # stream.  A partial codeword that is already too long can never be
+    # valid, so only as much of its end is kept as is needed for it to
+    # stay too long, and the rest is consumed.
+    restarts = starts.copy()
+    overlong = ~complete & (ends - starts >= MAX_CODE_LEN)
+    restarts[overlong] = ones[numpy.searchsorted(ones, ends[overlong] - MAX_CODE_LEN, side='right') - 1]
+    consumed = channel_ends.copy()
+    numpy.minimum.at(consumed, word_channel[~taken], restarts[~taken])
+    consumed -= offsets
+
+    decoded = taken & valid
+    sizes = numpy.bincount(word_channel[decoded], minlength=len(channels))
+    return numpy.split(characters[decoded], numpy.cumsum(sizes)[:-1]), consumed
+
+def decode_symbols(symbols, max_chars, threshold=0.5):
+    """
+    Decode the complete varicode characters in an array of soft symbols.
+
+    Positive symbols are ones and negative symbols are zeroes, and their
+    magnitude is their reliability.  Two zeroes more reliable than
+    threshold always mark the end of a codeword.  Between such boundaries,
+    the symbols are split into the sequence of codewords and idle zeroes
+    which best matches them.  At most max_chars characters are decoded.
+    Returns the decoded characters and the number of symbols used.
+    """
+    symbols = numpy.asarray(symbols, dtype=numpy.float64)
+    num_symbols = len(symbols)
+
+    # Only decode up to the last reliable boundary.  If there isn't one,
+    # settle for the last hard decision boundary.
+    zeroes = symbols < -threshold
+    boundaries = numpy.flatnonzero(zeroes[:-1] & zeroes[1:])
+    if len(boundaries) == 0:
+        zeroes = symbols < 0
+        boundaries = numpy.flatnonzero(zeroes[:-1] & zeroes[1:])
+    if len(boundaries) == 0:
+        if num_symbols > MAX_CODE_LEN + 2:
+            # No codeword can be this long, so it can be dropped.  Keep the
+            # last symbol, since it might start a boundary.
+            return numpy.zeros(0, dtype=numpy.int16), num_symbols - 1
+        return numpy.zeros(0, dtype=numpy.int16), 0
+    end = boundaries[-1] + 2
+    symbols = symbols[:end]
+
+    # Correlate each position with the best codeword of each length
+    padded = numpy.concatenate((symbols, numpy.zeros(MAX_CODE_LEN + 2)))
+    lengths = numpy.array(sorted(soft_codebook))
+    best_score = numpy.zeros((len(lengths), end))
+    best_row = numpy.zeros((len(lengths), end), dtype=numpy.int64)
+    for index, length in enumerate(lengths):
+        windows = numpy.lib.stride_tricks.sliding_window_view(padded, length)[:end]
+        scores = windows @ soft_codebook[length].T
+        best_row[index] = numpy.argmax(scores, axis=1)
+        best_score[index] = scores[numpy.arange(end), best_row[index]]
+
+    # Find the best parse into codewords and idle zeroes
+    total = numpy.full(end + 1, -numpy.inf)
+    total[0] = 0
+    step = numpy.zeros(end + 1, dtype=numpy.int64)
+    for position in range(end):
+        if total[position] - symbols[position] > total[position + 1]:
+            total[position + 1] = total[position] - symbols[position]
+            step[position + 1] = 1
+        targets = position + lengths
+        fits = targets <= end
+        scores = total[position] + best_score[fits, position]
+        better = scores > total[targets[fits]]
+        total[targets[fits][better]] = scores[better]
+        step[targets[fits][better]] = lengths[fits][better]
+
+    # Trace back through the parse to find the codewords
+    characters = []
+    ends = []
+    position = end
+    while position > 0:
+        length = step[position]
+        position -= length
+        if length > 1:
+            index = numpy.searchsorted(lengths, length)
+            characters.append(soft_characters[length][best_row[index, position]])
+            ends.append(position + length)
+    characters.reverse()
+    ends.reverse()
+
+    if len(characters) > max_chars:
+        end = ends[max_chars - 1] if max_chars > 0 else 0
+        characters = characters[:max_chars]
+    return numpy.array(characters, dtype=numpy.int16), end
+
+class encoder(object):
+    """
+    Varicode encoder for a stream of bytes.
+    """
+    def encode(self, data):
+        """
+        Encode bytes (or a uint8 array) to an int8 array of bits.
+        """
+        if isinstance(data, (bytes, bytearray)):
+            data = numpy.frombuffer(data, dtype=numpy.uint8)
+        bits, _ = encode_bytes(data)
+        return bits
+
+class decoder(object):
+    """
+    Varicode decoder for a stream of bits.  Bits may be fed in chunks of
+    any size; a codeword split across chunks is decoded once its closing
+    '00' arrives.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Discard any partially received codeword.
+        """
+        self.pending = numpy.zeros(0, dtype=numpy.int8)
+
+    def feed(self, bits):
+        """
+        Decode an array of bits, returning the characters completed by it.
+        """
+        bits = numpy.concatenate((self.pending, numpy.asarray(bits, dtype=numpy.int8)))
+        (decoded,), (num_consumed,) = decode_bits([bits], [len(bits)])
+        self.pending = bits[num_consumed:]
+        if len(self.pending) > MAX_CODE_LEN + 2:
+            # The pending codeword is already too long to be valid.  Only
+            # its last bit matters for finding its end, so keep a shortened
+            # version that is still too long and has the same last bit.
+            self.pending = numpy.concatenate((self.pending[:MAX_CODE_LEN], [1], self.pending[-1:])).astype(numpy.int8)
+        return decoded.astype(numpy.uint8).tobytes()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+
+import numpy
+from gnuradio import gr
+try:
+    from .varicode import decode_bits
+except ImportError:
+    from varicode import decode_bits
+
+WORK_CALLED_PRODUCE = -2 # gr::block::WORK_CALLED_PRODUCE
+
+class varicode_rx_multi(gr.basic_block):
+    """
+    Varicode decoder for several bit streams at once. Each input is decoded
+    independently to the output of the same number, but all of them are
+    handled in a single pass.
+    """
+    def __init__(self, num_channels=1):
+        gr.basic_block.__init__(self,
+            name="varicode_rx_multi",
+            in_sig=[numpy.int8] * num_channels,
+            out_sig=[numpy.int8] * num_channels)
+        self.num_channels = num_channels
+
+    def forecast(self, noutput_items, ninput_items_required):
+        return [noutput_items * 8] * self.num_channels
+
+    def general_work(self, input_items, output_items):
+        decoded, num_consumed = decode_bits(input_items, [len(out) for out in output_items])
+
+        for channel in range(self.num_channels):
+            output_items[channel][:len(decoded[channel])] = decoded[channel]
+            self.consume(channel, num_consumed[channel])
+            self.produce(channel, len(decoded[channel]))
+        return WORK_CALLED_PRODUCE
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+
+import numpy
+from gnuradio import gr
+try:
+    from .varicode import decode_symbols
+except ImportError:
+    from varicode import decode_symbols
+
+class varicode_rx_soft(gr.basic_block):
+    """
+    Varicode decoder for soft symbols, such as the real part of the output
+    of a differential phasor.  Positive symbols are ones and negative
+    symbols are zeroes.  Pairs of zeroes more reliable than threshold
+    always mark the end of a codeword; in between, the most likely
+    sequence of codewords is decoded.
+    """
+    def __init__(self, threshold=0.5):
+        gr.basic_block.__init__(self,
+            name="varicode_rx_soft",
+            in_sig=[numpy.float32],
+            out_sig=[numpy.int8])
+        self.threshold = threshold
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+
+    def forecast(self, noutput_items, ninput_items_required):
+        return [noutput_items * 8]
+
+    def general_work(self, input_items, output_items):
+        in0 = input_items[0]
+        out0 = output_items[0]
+
+        decoded, num_consumed = decode_symbols(in0, len(out0), self.threshold)
+        out0[:len(decoded)] = decoded
+
+        self.consume(0, num_consumed)
+        return len(decoded)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2026 Clayton Smith.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+
+from gnuradio import filter
+from gnuradio import gr
+from gnuradio.fft import window
+from gnuradio.filter import firdes
+
+def stage_decimations(decimation):
+    """
+    Split a decimation into one stage per prime factor, largest first.
+    """
+    factors = []
+    factor = 2
+    while decimation > 1:
+        while decimation % factor == 0:
+            factors.append(factor)
+            decimation //= factor
+        factor += 1
+    return sorted(factors, reverse=True)
+
+class xlating_decimator(gr.hier_block2):
+    """
+    Frequency translating decimator.  The signal at center_freq is moved
+    to zero, low pass filtered with the given cutoff and transition width,
+    and decimated, in one stage per prime factor of the decimation.  Only
+    the last stage needs the full filter: the earlier ones just have to
+    keep aliases out of the final band, so their filters are short, and
+    no stage runs a long filter at the input rate.
+    """
+    def __init__(self, samp_rate, decimation, center_freq, cutoff, transition, gain=1.0):
+        gr.hier_block2.__init__(self,
+            "xlating_decimator",
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+            gr.io_signature(1, 1, gr.sizeof_gr_complex))
+
+        pass_edge = cutoff - transition / 2
+        stop_edge = cutoff + transition / 2
+        decimations = stage_decimations(decimation) or [1]
+        rate = samp_rate
+        self.stages = []
+        for n, stage_decimation in enumerate(decimations):
+            if n == len(decimations) - 1:
+                taps = firdes.low_pass(gain, rate, cutoff, transition, window.WIN_HAMMING, 6.76)
+            else:
+                alias_edge = rate / stage_decimation - stop_edge
+                taps = firdes.low_pass(1, rate, (pass_edge + alias_edge) / 2, alias_edge - pass_edge,
+                                       window.WIN_HAMMING, 6.76)
+            if n == 0:
+                stage = filter.freq_xlating_fir_filter_ccf(stage_decimation, taps, center_freq, rate)
+            else:
+                stage = filter.fir_filter_ccf(stage_decimation, taps)
+            self.stages.append(stage)
+            rate /= stage_decimation
+
+        self.connect(self, *self.stages)
+        self.connect(self.stages[-1], self)
+
+    def set_center_freq(self, center_freq):
+        self.stages[0].set_center_freq(center_freq)